@@ -4,9 +4,9 @@ Dedicated system for analyzing temporal changes in satellite imagery.
 """
 
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from PIL import Image
-from .image_analyzer import ImageAnalyzer
+from .image_analyzer import ImageAnalyzer, SIMILARITY_METRIC_NAMES, similarity_bucket
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -61,6 +61,7 @@ If images are NOT of the same location, clearly state this and explain the diffe
         self,
         image1_path: str,
         image2_path: str,
+        *,
         date1: Optional[str] = None,
         date2: Optional[str] = None,
         location: Optional[str] = None
@@ -132,11 +133,12 @@ If images are NOT of the same location, clearly state this and explain the diffe
 
         # Similarity analysis
         score = comparison["similarity_score"]
-        if score < 0.3:
+        bucket = similarity_bucket(comparison)
+        if bucket == 0:
             similarity_level = "VERY LOW - Potentially different locations or extreme changes"
-        elif score < 0.6:
+        elif bucket == 1:
             similarity_level = "LOW - Major changes detected"
-        elif score < 0.85:
+        elif bucket == 2:
             similarity_level = "MODERATE - Notable changes present"
         else:
             similarity_level = "HIGH - Minor or seasonal changes only"
@@ -179,7 +181,8 @@ If images are NOT of the same location, clearly state this and explain the diffe
                 "after": caption2
             },
             "similarity_analysis": {
-                "ssim_score": score,
+                "similarity_score": score,
+                "method": comparison["method"],
                 "level": similarity_level,
                 "num_changed_regions": comparison["num_changes"],
                 "total_change_area": comparison["total_change_area"]
@@ -187,7 +190,7 @@ If images are NOT of the same location, clearly state this and explain the diffe
             "object_changes": object_changes,
             "detailed_report": self._generate_detailed_report(
                 caption1, caption2, object_changes, comparison,
-                time_info, location_info, similarity_level
+                time_info, location_info, similarity_level, bucket
             )
         }
 
@@ -201,10 +204,20 @@ If images are NOT of the same location, clearly state this and explain the diffe
         comparison: dict,
         time_info: str,
         location_info: str,
-        similarity_level: str
+        similarity_level: str,
+        bucket: int
     ) -> str:
         """Generate human-readable detailed report."""
 
+        if comparison["method"] == "phash":
+            # Resolutions too different for SSIM, so no change regions were located
+            region_lines = ["**Changed Regions Detected**: n/a (image resolutions differ too much)"]
+        else:
+            region_lines = [
+                f"**Changed Regions Detected**: {comparison['num_changes']}",
+                f"**Total Changed Area**: {comparison['total_change_area']:,} pixels",
+            ]
+
         report_lines = [
             "=" * 80,
             "🛰️  SATELLITE IMAGERY TEMPORAL CHANGE DETECTION REPORT",
@@ -219,10 +232,9 @@ If images are NOT of the same location, clearly state this and explain the diffe
             "",
             "📊 SIMILARITY ANALYSIS",
             "-" * 80,
-            f"**Structural Similarity (SSIM)**: {comparison['similarity_score']:.3f}",
+            f"**{SIMILARITY_METRIC_NAMES[comparison['method']]}**: {comparison['similarity_score']:.3f}",
             f"**Assessment**: {similarity_level}",
-            f"**Changed Regions Detected**: {comparison['num_changes']}",
-            f"**Total Changed Area**: {comparison['total_change_area']:,} pixels",
+            *region_lines,
             ""
         ]
 
@@ -265,17 +277,17 @@ If images are NOT of the same location, clearly state this and explain the diffe
         ])
 
         # Automated interpretation based on data
-        if comparison['similarity_score'] < 0.3:
+        if bucket == 0:
             report_lines.append(
                 "⚠️  **WARNING**: Very low similarity suggests these may be different locations "
                 "or catastrophic changes have occurred."
             )
-        elif comparison['similarity_score'] < 0.6:
+        elif bucket == 1:
             report_lines.append(
                 "📈 **MAJOR CHANGES**: Significant transformation of the landscape detected. "
                 "This could indicate urban development, deforestation, natural disasters, or land use changes."
             )
-        elif comparison['similarity_score'] < 0.85:
+        elif bucket == 2:
             report_lines.append(
                 "📊 **MODERATE CHANGES**: Notable differences observed. Could be seasonal variations, "
                 "gradual development, or environmental changes."
@@ -299,28 +311,26 @@ If images are NOT of the same location, clearly state this and explain the diffe
         """Get the specialized change detection system prompt."""
         return self.CHANGE_DETECTION_SYSTEM_PROMPT
 
-    def format_for_llm(self, analysis: Optional[Dict] = None) -> str:
+    def format_messages(self, analysis: Optional[Dict] = None) -> List[Dict[str, str]]:
         """
-        Format analysis for LLM consumption with the system prompt.
+        Format analysis as chat messages with the system prompt kept separate.
+
+        The system prompt is identical on every call, so chat APIs with prompt
+        caching can reuse it as a cached prefix; only the user turn changes.
 
         Args:
             analysis: Analysis dictionary (uses current if None)
 
         Returns:
-            Formatted text for LLM
+            List of system and user messages, or an empty list if no analysis is available
         """
         if analysis is None:
             analysis = self.current_analysis
 
         if not analysis:
-            return "No analysis available. Please run analyze_temporal_changes first."
-
-        # Combine system prompt with analysis
-        formatted = f"""{self.CHANGE_DETECTION_SYSTEM_PROMPT}
-
----
+            return []
 
-ANALYSIS DATA:
+        user_content = f"""ANALYSIS DATA:
 
 {analysis['detailed_report']}
 
@@ -330,7 +340,28 @@ Based on the above technical analysis, please provide a comprehensive change det
 following the guidelines in your system prompt.
 """
 
-        return formatted
+        return [
+            {"role": "system", "content": self.CHANGE_DETECTION_SYSTEM_PROMPT},
+            {"role": "user", "content": user_content},
+        ]
+
+    def format_for_llm(self, analysis: Optional[Dict] = None) -> str:
+        """
+        Format analysis for LLM consumption with the system prompt.
+
+        Args:
+            analysis: Analysis dictionary (uses current if None)
+
+        Returns:
+            Formatted text for LLM
+        """
+        messages = self.format_messages(analysis)
+        if not messages:
+            return "No analysis available. Please run analyze_temporal_changes first."
+
+        # Combine system prompt with analysis, keeping the static prompt first
+        system, user = messages
+        return f"{system['content']}\n\n---\n\n{user['content']}"
 
 
 if __name__ == "__main__":
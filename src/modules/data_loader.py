@@ -5,7 +5,7 @@ This module handles loading Pokémon data from CSV/Excel and creating a vector s
 
 import os
 import pandas as pd
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.vectorstores import Chroma
 from langchain.docstore.document import Document
@@ -15,6 +15,25 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows read and embedded at a time by initialize_incremental
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Optional faster parsers: python-calamine (Rust) for Excel, pyarrow for CSV.
+# None lets pandas pick its default engine.
+try:
+    import python_calamine  # noqa: F401
+    # pandas only knows the calamine engine from 2.2 on
+    _PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    EXCEL_ENGINE = "calamine" if _PANDAS_VERSION >= (2, 2) else None
+except ImportError:
+    EXCEL_ENGINE = None
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_READ_KWARGS = {"engine": "pyarrow", "dtype_backend": "pyarrow"}
+except ImportError:
+    CSV_READ_KWARGS = {}
+
 
 class PokemonDataLoader:
     """Handles loading and processing Pokémon dataset for RAG."""
@@ -59,33 +78,99 @@ class PokemonDataLoader:
         logger.info(f"Loading Pokémon data from: {file_path}")
 
         if file_path.endswith('.csv'):
-            self.df = pd.read_csv(file_path)
+            self.df = pd.read_csv(file_path, **CSV_READ_KWARGS)
         elif file_path.endswith(('.xlsx', '.xls')):
-            self.df = pd.read_excel(file_path)
+            self.df = pd.read_excel(file_path, engine=EXCEL_ENGINE)
         else:
             raise ValueError("Unsupported file format. Use CSV or Excel.")
 
         logger.info(f"Loaded {len(self.df)} Pokémon entries")
         return self.df
 
-    def create_documents(self) -> List[Document]:
+    def iter_pokemon_data(self, file_path: str, chunksize: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Read Pokémon data from CSV or Excel file in chunks of rows.
+
+        CSV files are streamed by pandas and, unless calamine is available,
+        .xlsx files through openpyxl's read-only mode, so the whole file is
+        never parsed up front.
+
+        Args:
+            file_path: Path to the data file
+            chunksize: Maximum number of rows per chunk
+
+        Yields:
+            DataFrames of consecutive rows, indexed by row position in the file
+        """
+        logger.info(f"Streaming Pokémon data from: {file_path}")
+
+        if file_path.endswith('.csv'):
+            # The pyarrow engine can't read in chunks, so streaming uses pandas' C parser
+            yield from pd.read_csv(file_path, chunksize=chunksize)
+        elif file_path.endswith('.xlsx') and EXCEL_ENGINE is None:
+            yield from self._iter_xlsx_chunks(file_path, chunksize)
+        elif file_path.endswith(('.xlsx', '.xls')):
+            # calamine parses the whole workbook faster than openpyxl can stream it,
+            # and legacy .xls has no streaming reader; parse it whole and slice
+            df = pd.read_excel(file_path, engine=EXCEL_ENGINE)
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize]
+        else:
+            raise ValueError("Unsupported file format. Use CSV or Excel.")
+
+    @staticmethod
+    def _iter_xlsx_chunks(file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Stream the first worksheet of an .xlsx file as DataFrame chunks."""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            # Match pandas' naming of blank header cells
+            columns = [
+                name if name is not None else f"Unnamed: {i}"
+                for i, name in enumerate(header)
+            ]
+
+            batch = []
+            start = 0
+            for row in rows:
+                batch.append(row)
+                if len(batch) == chunksize:
+                    yield pd.DataFrame(batch, columns=columns, index=range(start, start + len(batch)))
+                    start += len(batch)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=columns, index=range(start, start + len(batch)))
+        finally:
+            workbook.close()
+
+    def create_documents(self, df: Optional[pd.DataFrame] = None) -> List[Document]:
         """
         Convert DataFrame rows into LangChain Document objects.
 
+        Args:
+            df: Rows to convert (defaults to the loaded DataFrame)
+
         Returns:
             List of Document objects
         """
-        if self.df is None:
+        if df is None:
+            df = self.df
+        if df is None:
             raise ValueError("No data loaded. Call load_pokemon_data first.")
 
         documents = []
 
-        for idx, row in self.df.iterrows():
+        for idx, row in df.iterrows():
             # Create a descriptive text for each Pokémon
             text_parts = []
 
             # Add all column information
-            for col in self.df.columns:
+            for col in df.columns:
                 value = row[col]
                 if pd.notna(value):
                     text_parts.append(f"{col}: {value}")
@@ -99,7 +184,7 @@ class PokemonDataLoader:
                 metadata={
                     "source": "pokemon_dataset",
                     "row_index": idx,
-                    **{col: str(row[col]) for col in self.df.columns if pd.notna(row[col])}
+                    **{col: str(row[col]) for col in df.columns if pd.notna(row[col])}
                 }
             )
             documents.append(doc)
@@ -178,6 +263,62 @@ class PokemonDataLoader:
 
         logger.info("Initialization complete")
 
+    def initialize_incremental(
+        self,
+        data_file: str,
+        force_recreate: bool = False,
+        chunksize: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[int]:
+        """
+        Initialization workflow that reads and indexes the data file chunk by chunk.
+
+        Args:
+            data_file: Path to the Pokémon data file
+            force_recreate: If True, recreate the vector store
+            chunksize: Number of rows read and embedded at a time
+
+        Yields:
+            Number of rows indexed so far, after each chunk
+        """
+        logger.info("Initializing Pokémon data loader incrementally")
+
+        # Load embeddings
+        self.load_embeddings()
+
+        # Reuse an existing vector store, as initialize does
+        if os.path.exists(self.persist_directory) and not force_recreate:
+            self.load_pokemon_data(data_file)
+            self.create_vector_store([], force_recreate=False)
+            yield len(self.df)
+            return
+
+        logger.info("Creating new vector store")
+        self.vectorstore = None
+        chunks = []
+        rows_indexed = 0
+
+        for chunk in self.iter_pokemon_data(data_file, chunksize):
+            documents = self.create_documents(chunk)
+            if self.vectorstore is None:
+                self.vectorstore = Chroma.from_documents(
+                    documents=documents,
+                    embedding=self.embeddings,
+                    persist_directory=self.persist_directory
+                )
+            else:
+                self.vectorstore.add_documents(documents)
+
+            chunks.append(chunk)
+            rows_indexed += len(chunk)
+            yield rows_indexed
+
+        if not chunks:
+            raise ValueError("The data file contains no rows.")
+
+        self.df = pd.concat(chunks)
+        self.vectorstore.persist()
+        logger.info(f"Indexed {rows_indexed} Pokémon entries")
+
 
 def test_data_loader():
     """Test the data loader with sample data."""
@@ -4,6 +4,8 @@ Handles image captioning, object detection, and change detection using open-sour
 """
 
 import os
+import bisect
+import hashlib
 import cv2
 import numpy as np
 from PIL import Image
@@ -14,23 +16,71 @@ import logging
 # Import transformers for BLIP and DETR
 from transformers import (
     BlipProcessor, BlipForConditionalGeneration,
-    DetrImageProcessor, DetrForObjectDetection
+    DetrImageProcessor, DetrForObjectDetection,
+    VisionEncoderDecoderModel, ViTImageProcessor, AutoTokenizer
 )
 import torch
 
+# Optional ONNX Runtime backend for captioning (pip install optimum[onnxruntime]).
+# optimum has no ONNX Runtime class for DETR, so detection always runs on PyTorch.
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForVision2Seq
+except ImportError:
+    ort = None
+    ORTModelForVision2Seq = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Captioning models
+DEFAULT_CAPTIONING_MODEL = "Salesforce/blip-image-captioning-base"
+FAST_CAPTIONING_MODEL = "ydshieh/vit-gpt2-coco-en"  # ViT-GPT2, roughly half the FLOPs of BLIP-base
+
+# ONNX exports are saved here once and loaded from disk on later starts
+ONNX_CACHE_DIR = "data/cache/onnx"
+ONNX_EXPORT_FAILED_MARKER = "export_failed"  # Written when a model can't be exported
+
+# Target size for JPEG draft decoding (BLIP uses 384px, DETR <= 800px shortest edge)
+DRAFT_SIZE = (1024, 1024)
+
+# Above this resolution ratio SSIM is meaningless, so a perceptual hash is used instead
+MAX_SSIM_SCALE_RATIO = 2.0
+
+# Similarity bucket boundaries (very low / low / moderate / high) per comparison method.
+# Unrelated images still agree on about half of their perceptual-hash bits.
+SIMILARITY_THRESHOLDS = {"ssim": (0.3, 0.6, 0.85), "phash": (0.65, 0.8, 0.9)}
+SIMILARITY_METRIC_NAMES = {"ssim": "Structural Similarity (SSIM)", "phash": "Perceptual Hash Agreement"}
+
+
+def image_fingerprint(image_path: str) -> str:
+    """Hash an image file's bytes, without decoding it, into a short hex key."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(image_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def similarity_bucket(comparison: Dict) -> int:
+    """Bucket a compare_images result: 0 = very low, 1 = low, 2 = moderate, 3 = high similarity."""
+    thresholds = SIMILARITY_THRESHOLDS[comparison["method"]]
+    return bisect.bisect_right(thresholds, comparison["similarity_score"])
+
 
 class ImageAnalyzer:
     """Handles all image analysis tasks including captioning, detection, and comparison."""
 
-    def __init__(self, device: Optional[str] = None):
+    def __init__(self, device: Optional[str] = None, fast_caption: bool = False,
+                 use_onnx: bool = False):
         """
         Initialize the image analyzer.
 
         Args:
             device: Device to run models on ('cuda', 'cpu', or None for auto)
+            fast_caption: Use the smaller ViT-GPT2 captioner instead of BLIP
+            use_onnx: Run the captioning model through ONNX Runtime (exported once
+                into ONNX_CACHE_DIR); object detection always uses PyTorch
         """
         if device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -39,9 +89,14 @@ class ImageAnalyzer:
 
         logger.info(f"Using device: {self.device}")
 
+        self.fast_caption = fast_caption
+
+        self.use_onnx = use_onnx
+
         # Model placeholders
-        self.blip_processor = None
-        self.blip_model = None
+        self.caption_processor = None
+        self.caption_model = None
+        self.caption_tokenizer = None  # Only used by the fast (ViT-GPT2) captioner
         self.detr_processor = None
         self.detr_model = None
 
@@ -49,18 +104,118 @@ class ImageAnalyzer:
         self.caption_cache = {}
         self.objects_cache = {}
 
-    def load_captioning_model(self, model_name: str = "Salesforce/blip-image-captioning-base"):
+    def _load_rgb_image(self, image_path: str) -> Tuple[Image.Image, Tuple[int, int]]:
+        """
+        Load an image as RGB, letting libjpeg downscale JPEGs during decode.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Tuple of (RGB image, original (width, height) before draft decoding)
+        """
+        image = Image.open(image_path)
+        original_size = image.size
+
+        # draft() only has an effect on JPEG; decodes at 1/2, 1/4 or 1/8 scale
+        if image.format == "JPEG":
+            image.draft("RGB", DRAFT_SIZE)
+
+        return image.convert("RGB"), original_size
+
+    def load_captioning_model(self, model_name: Optional[str] = None, fast: bool = False):
         """
-        Load the BLIP image captioning model.
+        Load the image captioning model.
 
         Args:
-            model_name: Name of the BLIP model to use
+            model_name: Name of the captioning model to use (defaults depend on `fast`)
+            fast: Load a ViT-GPT2 encoder-decoder captioner instead of BLIP
         """
+        if model_name is None:
+            model_name = FAST_CAPTIONING_MODEL if fast else DEFAULT_CAPTIONING_MODEL
+
         logger.info(f"Loading captioning model: {model_name}")
-        self.blip_processor = BlipProcessor.from_pretrained(model_name)
-        self.blip_model = BlipForConditionalGeneration.from_pretrained(model_name).to(self.device)
+        self._load_caption_processors(model_name, fast)
+        if fast:
+            self.caption_model = VisionEncoderDecoderModel.from_pretrained(model_name).to(self.device)
+        else:
+            self.caption_model = BlipForConditionalGeneration.from_pretrained(model_name).to(self.device)
         logger.info("Captioning model loaded successfully")
 
+    def _load_caption_processors(self, model_name: str, fast: bool):
+        """Load the image processor (and tokenizer for the fast captioner)."""
+        if fast:
+            self.caption_processor = ViTImageProcessor.from_pretrained(model_name)
+            self.caption_tokenizer = AutoTokenizer.from_pretrained(model_name)
+        else:
+            self.caption_processor = BlipProcessor.from_pretrained(model_name)
+            self.caption_tokenizer = None
+
+    def _onnx_session_options(self):
+        """Build ONNX Runtime session options with full graph optimization."""
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = os.cpu_count() or 1
+        return options
+
+    def _onnx_provider(self) -> str:
+        """Get the ONNX Runtime execution provider for the current device."""
+        return "CUDAExecutionProvider" if self.device == "cuda" else "CPUExecutionProvider"
+
+    def load_captioning_model_onnx(self, model_name: Optional[str] = None, fast: bool = False):
+        """
+        Load the captioning model with ONNX Runtime, exporting it on first use.
+
+        The export is saved under ONNX_CACHE_DIR and reused by later processes.
+        Falls back to the PyTorch model if optimum is missing or the export
+        fails; a failed export is remembered so it isn't retried on every start.
+
+        Args:
+            model_name: Name of the captioning model to use (defaults depend on `fast`)
+            fast: Load a ViT-GPT2 encoder-decoder captioner instead of BLIP
+        """
+        if model_name is None:
+            model_name = FAST_CAPTIONING_MODEL if fast else DEFAULT_CAPTIONING_MODEL
+
+        if ORTModelForVision2Seq is None:
+            logger.warning("optimum[onnxruntime] not installed, using PyTorch captioning model")
+            self.load_captioning_model(model_name, fast=fast)
+            return
+
+        export_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"))
+        failed_marker = os.path.join(export_dir, ONNX_EXPORT_FAILED_MARKER)
+        if os.path.exists(failed_marker):
+            logger.info(f"{model_name} could not be exported to ONNX before, using PyTorch model")
+            self.load_captioning_model(model_name, fast=fast)
+            return
+
+        exported = os.path.isdir(export_dir) and any(
+            name.endswith(".onnx") for name in os.listdir(export_dir)
+        )
+        try:
+            logger.info(f"Loading ONNX captioning model: {model_name}")
+            model = ORTModelForVision2Seq.from_pretrained(
+                export_dir if exported else model_name,
+                export=not exported,
+                provider=self._onnx_provider(),
+                session_options=self._onnx_session_options()
+            )
+            if not exported:
+                model.save_pretrained(export_dir)
+                logger.info(f"Saved ONNX export of {model_name} to {export_dir}")
+        except Exception as e:
+            logger.warning(f"ONNX export failed for {model_name}, using PyTorch model: {e}")
+            if not exported:
+                os.makedirs(export_dir, exist_ok=True)
+                with open(failed_marker, "w") as f:
+                    f.write(str(e))
+            self.load_captioning_model(model_name, fast=fast)
+            return
+
+        self._load_caption_processors(model_name, fast)
+        self.caption_model = model
+        logger.info("ONNX captioning model loaded successfully")
+
     def load_detection_model(self, model_name: str = "facebook/detr-resnet-50"):
         """
         Load the DETR object detection model.
@@ -90,20 +245,26 @@ class ImageAnalyzer:
             return self.caption_cache[image_path]
 
         # Load models if needed
-        if self.blip_model is None:
-            self.load_captioning_model()
+        if self.caption_model is None:
+            if self.use_onnx:
+                self.load_captioning_model_onnx(fast=self.fast_caption)
+            else:
+                self.load_captioning_model(fast=self.fast_caption)
 
         logger.info(f"Generating caption for: {image_path}")
 
         # Load and process image
-        image = Image.open(image_path).convert("RGB")
-        inputs = self.blip_processor(image, return_tensors="pt").to(self.device)
+        image, _ = self._load_rgb_image(image_path)
+        inputs = self.caption_processor(images=image, return_tensors="pt").to(self.device)
 
         # Generate caption
         with torch.no_grad():
-            outputs = self.blip_model.generate(**inputs, max_length=50)
+            outputs = self.caption_model.generate(**inputs, max_length=50)
 
-        caption = self.blip_processor.decode(outputs[0], skip_special_tokens=True)
+        if self.caption_tokenizer is not None:
+            caption = self.caption_tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
+        else:
+            caption = self.caption_processor.decode(outputs[0], skip_special_tokens=True)
 
         # Cache result
         self.caption_cache[image_path] = caption
@@ -137,28 +298,33 @@ class ImageAnalyzer:
         logger.info(f"Detecting objects in: {image_path}")
 
         # Load and process image
-        image = Image.open(image_path).convert("RGB")
+        image, original_size = self._load_rgb_image(image_path)
         inputs = self.detr_processor(images=image, return_tensors="pt").to(self.device)
 
         # Detect objects
         with torch.no_grad():
             outputs = self.detr_model(**inputs)
 
-        # Post-process results
-        target_sizes = torch.tensor([image.size[::-1]]).to(self.device)
+        # Post-process results (boxes are scaled back to the original resolution)
+        target_sizes = torch.tensor([original_size[::-1]]).to(self.device)
         results = self.detr_processor.post_process_object_detection(
             outputs, threshold=confidence_threshold, target_sizes=target_sizes
         )[0]
 
-        # Extract detections
-        detections = []
-        for score, label, box in zip(results["scores"], results["labels"], results["boxes"]):
-            label_name = self.detr_model.config.id2label[int(label)]
-            detections.append({
-                "label": label_name,
+        # Extract detections (one device-to-host copy per tensor, not per detection)
+        scores = results["scores"].detach().cpu().numpy()
+        labels = results["labels"].detach().cpu().numpy()
+        boxes = results["boxes"].detach().cpu().numpy()
+        id2label = self.detr_model.config.id2label
+
+        detections = [
+            {
+                "label": id2label[int(label)],
                 "confidence": float(score),
-                "box": box.cpu().tolist()
-            })
+                "box": box.tolist()
+            }
+            for score, label, box in zip(scores, labels, boxes)
+        ]
 
         # Cache result
         self.objects_cache[cache_key] = detections
@@ -192,6 +358,26 @@ class ImageAnalyzer:
         gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
         gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
 
+        # Drastically different resolutions: compare perceptual hashes instead of SSIM
+        (h1, w1), (h2, w2) = gray1.shape, gray2.shape
+        scale_ratio = max(h1 / h2, h2 / h1, w1 / w2, w2 / w1)
+        if scale_ratio > MAX_SSIM_SCALE_RATIO:
+            logger.info(f"Image scale ratio {scale_ratio:.1f} too large for SSIM, using perceptual hash")
+            hash1 = self._perceptual_hash(gray1)
+            hash2 = self._perceptual_hash(gray2)
+            score = 1.0 - np.count_nonzero(hash1 != hash2) / hash1.size
+
+            result = {
+                "similarity_score": float(score),
+                "num_changes": 0,
+                "change_regions": [],
+                "total_change_area": 0,
+                "method": "phash"
+            }
+            if return_diff_image:
+                result["diff_image"] = None
+            return result
+
         # Resize images to match if needed
         if gray1.shape != gray2.shape:
             logger.info("Resizing images to match dimensions")
@@ -200,13 +386,15 @@ class ImageAnalyzer:
             gray1 = cv2.resize(gray1, (width, height))
             gray2 = cv2.resize(gray2, (width, height))
 
-        # Compute SSIM
-        score, diff = ssim(gray1, gray2, full=True)
+        # Compute SSIM (skimage's float map for visualization; otherwise the same
+        # score from integer window sums, with a uint8 map for thresholding)
+        if return_diff_image:
+            score, diff = ssim(gray1, gray2, full=True)
+            diff = (diff * 255).astype("uint8")
+        else:
+            score, diff = self._ssim_int_approx(gray1, gray2)
         logger.info(f"SSIM similarity score: {score:.4f}")
 
-        # Convert difference to uint8
-        diff = (diff * 255).astype("uint8")
-
         # Threshold the difference image
         thresh = cv2.threshold(diff, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
 
@@ -233,7 +421,8 @@ class ImageAnalyzer:
             "similarity_score": float(score),
             "num_changes": len(change_regions),
             "change_regions": change_regions,
-            "total_change_area": sum(r["area"] for r in change_regions)
+            "total_change_area": sum(r["area"] for r in change_regions),
+            "method": "ssim"
         }
 
         if return_diff_image:
@@ -242,8 +431,82 @@ class ImageAnalyzer:
         logger.info(f"Detected {len(change_regions)} change regions")
         return result
 
+    @staticmethod
+    def _ssim_int_approx(gray1: np.ndarray, gray2: np.ndarray,
+                         win_size: int = 7) -> Tuple[float, np.ndarray]:
+        """
+        Compute SSIM from integer box-filter sums.
+
+        Mirrors skimage's defaults (uniform window, sample covariance, data range 255)
+        but works on integer window sums instead of float64 convolutions. The
+        score is the signed mean SSIM; only the returned map is clipped to 0..255
+        for thresholding.
+
+        Args:
+            gray1: First grayscale image (uint8)
+            gray2: Second grayscale image (uint8), same shape as gray1
+            win_size: Side length of the averaging window
+
+        Returns:
+            Tuple of (signed mean SSIM score, SSIM map clipped and scaled to uint8)
+        """
+        n = win_size * win_size
+        ksize = (win_size, win_size)
+
+        def window_sum(img: np.ndarray) -> np.ndarray:
+            return cv2.boxFilter(img, cv2.CV_32S, ksize, normalize=False,
+                                 borderType=cv2.BORDER_REFLECT).astype(np.int64)
+
+        # Pixel products fit in uint16 (255 * 255 = 65025)
+        g1 = gray1.astype(np.uint16)
+        g2 = gray2.astype(np.uint16)
+
+        s1 = window_sum(gray1)
+        s2 = window_sum(gray2)
+        s11 = window_sum(g1 * g1)
+        s22 = window_sum(g2 * g2)
+        s12 = window_sum(g1 * g2)
+
+        # C1 = (0.01 * 255)^2 and C2 = (0.03 * 255)^2, rescaled to window sums
+        c1 = round(6.5025 * n * n)
+        c2 = round(58.5225 * n * (n - 1))
+
+        luminance_num = 2 * s1 * s2 + c1
+        luminance_den = s1 * s1 + s2 * s2 + c1
+        contrast_num = 2 * (n * s12 - s1 * s2) + c2
+        contrast_den = (n * s11 - s1 * s1) + (n * s22 - s2 * s2) + c2
+
+        # Ignore the border, as skimage does. The score keeps negative values
+        # (e.g. inverted images), so it's taken from the unclipped ratio.
+        pad = (win_size - 1) // 2
+        inner = np.s_[pad:-pad, pad:-pad]
+        score = ((luminance_num[inner] * contrast_num[inner]) /
+                 (luminance_den[inner] * contrast_den[inner])).mean()
+
+        luminance = (luminance_num * 255) // luminance_den
+        ssim_map = np.clip((luminance * contrast_num) // contrast_den, 0, 255).astype(np.uint8)
+        return float(score), ssim_map
+
+    @staticmethod
+    def _perceptual_hash(gray: np.ndarray, hash_size: int = 8) -> np.ndarray:
+        """
+        Compute a DCT-based perceptual hash (pHash) of a grayscale image.
+
+        Args:
+            gray: Grayscale image
+            hash_size: Side length of the hash (hash has hash_size**2 bits)
+
+        Returns:
+            Boolean array of hash bits
+        """
+        size = hash_size * 4
+        small = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+        dct = cv2.dct(small.astype(np.float32))[:hash_size, :hash_size]
+        return dct > np.median(dct)
+
     def analyze_differences(self, image1_path: str, image2_path: str,
-                            include_objects: bool = True) -> str:
+                            include_objects: bool = True,
+                            fast_path_threshold: float = 0.98) -> str:
         """
         Comprehensive analysis of differences between two images.
 
@@ -251,18 +514,25 @@ class ImageAnalyzer:
             image1_path: Path to the first (before) image
             image2_path: Path to the second (after) image
             include_objects: Whether to include object detection analysis
+            fast_path_threshold: SSIM score above which the images are treated as
+                identical and the second caption/detection pass is skipped
 
         Returns:
             Detailed text summary of differences
         """
         logger.info("Performing comprehensive difference analysis")
 
+        # Compare images first so near-identical pairs can skip model work
+        comparison = self.compare_images(image1_path, image2_path)
+        nearly_identical = comparison["similarity_score"] > fast_path_threshold
+
         # Generate captions
         caption1 = self.generate_caption(image1_path)
-        caption2 = self.generate_caption(image2_path)
-
-        # Compare images
-        comparison = self.compare_images(image1_path, image2_path)
+        if nearly_identical:
+            logger.info("Images are nearly identical, reusing first caption")
+            caption2 = caption1
+        else:
+            caption2 = self.generate_caption(image2_path)
 
         # Start building summary
         summary_parts = []
@@ -271,28 +541,34 @@ class ImageAnalyzer:
         summary_parts.append(f"Image 1 Description: {caption1}")
         summary_parts.append(f"Image 2 Description: {caption2}\n")
 
-        # Structural similarity analysis
+        # Similarity analysis
         score = comparison["similarity_score"]
-        summary_parts.append(f"Structural Similarity (SSIM): {score:.2f}")
+        summary_parts.append(f"{SIMILARITY_METRIC_NAMES[comparison['method']]}: {score:.2f}")
 
-        if score < 0.3:
+        bucket = similarity_bucket(comparison)
+        if bucket == 0:
             summary_parts.append("⚠️ VERY LOW SIMILARITY: These images may be of completely different locations or scenes.")
-        elif score < 0.6:
+        elif bucket == 1:
             summary_parts.append("📊 MAJOR CHANGES: Significant differences detected between the images.")
-        elif score < 0.85:
+        elif bucket == 2:
             summary_parts.append("🔍 MODERATE CHANGES: Notable differences present.")
         else:
             summary_parts.append("✓ MINOR CHANGES: Images are quite similar with only small variations.\n")
 
         # Change regions
         num_changes = comparison["num_changes"]
-        if num_changes > 0:
+        if comparison["method"] == "phash":
+            summary_parts.append("\nChange regions not located: image resolutions differ too much for a pixel-level comparison")
+        elif num_changes > 0:
             total_area = comparison["total_change_area"]
             summary_parts.append(f"\nDetected {num_changes} regions with significant changes")
             summary_parts.append(f"Total changed area: {total_area} pixels")
 
         # Object detection comparison (if enabled)
-        if include_objects:
+        if include_objects and nearly_identical:
+            summary_parts.append("\n=== OBJECT-LEVEL CHANGES ===")
+            summary_parts.append("  No object-level changes (images are nearly identical)")
+        elif include_objects:
             try:
                 objects1 = self.detect_objects(image1_path)
                 objects2 = self.detect_objects(image2_path)
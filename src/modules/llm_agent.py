@@ -5,15 +5,14 @@ Integrates LLM with RAG and image analysis tools for conversational AI.
 
 import os
 import logging
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, Iterator, List
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
 
-from langchain.llms import HuggingFacePipeline
-from langchain.chains import RetrievalQA
-from langchain.agents import Tool, AgentExecutor, ConversationalAgent
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import PromptTemplate
+# transformers' model classes and LangChain's LLM, chain and agent modules are
+# only needed by the full LLMAgent, so they are imported where used to keep
+# SimpleLLMAgent startup light
+if TYPE_CHECKING:
+    from langchain.agents import Tool
 
 from .data_loader import PokemonDataLoader
 from .image_analyzer import ImageAnalyzer
@@ -60,18 +59,25 @@ class LLMAgent:
         self.image1_path = None
         self.image2_path = None
 
-    def load_llm(self, load_in_8bit: bool = True, max_length: int = 512):
+    def load_llm(self, load_in_8bit: bool = True, max_new_tokens: int = 256,
+                 batch_size: int = 4):
         """
         Load the language model.
 
         Args:
             load_in_8bit: Whether to use 8-bit quantization
-            max_length: Maximum sequence length
+            max_new_tokens: Maximum number of tokens to generate per call
+            batch_size: Number of prompts the pipeline generates for at once
         """
         logger.info(f"Loading language model: {self.model_name}")
 
+        from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+
         # Load tokenizer
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, padding_side="left")
+        if self.tokenizer.pad_token is None:
+            # Batched generation needs a pad token
+            self.tokenizer.pad_token = self.tokenizer.eos_token
 
         # Load model with appropriate settings
         model_kwargs = {
@@ -87,12 +93,16 @@ class LLMAgent:
             **model_kwargs
         )
 
-        # Create pipeline
+        # Create pipeline (the model is already dispatched by device_map above).
+        # return_full_text=False keeps the prompt out of the output, and
+        # max_new_tokens bounds generation by output length rather than prompt + output.
         pipe = pipeline(
             "text-generation",
             model=self.model,
             tokenizer=self.tokenizer,
-            max_length=max_length,
+            batch_size=batch_size,
+            return_full_text=False,
+            max_new_tokens=max_new_tokens,
             temperature=0.7,
             top_p=0.95,
             repetition_penalty=1.15,
@@ -100,6 +110,7 @@ class LLMAgent:
         )
 
         # Wrap in LangChain
+        from langchain.llms import HuggingFacePipeline
         self.llm = HuggingFacePipeline(pipeline=pipe)
         logger.info("Language model loaded successfully")
 
@@ -116,7 +127,28 @@ class LLMAgent:
         # Initialize data loader
         self.data_loader.initialize(data_file, force_recreate)
 
-        # Create QA chain
+        self._create_qa_chain()
+
+    def ingest_pokemon_rag(self, data_file: str, force_recreate: bool = False) -> Iterator[int]:
+        """
+        Initialize the Pokémon RAG system, indexing the data file chunk by chunk.
+
+        Args:
+            data_file: Path to Pokémon data file
+            force_recreate: Whether to recreate the vector store
+
+        Yields:
+            Number of rows indexed so far
+        """
+        logger.info("Initializing Pokémon RAG system incrementally")
+
+        yield from self.data_loader.initialize_incremental(data_file, force_recreate)
+
+        self._create_qa_chain()
+
+    def _create_qa_chain(self):
+        """Create the retrieval QA chain over the loaded vector store."""
+        from langchain.chains import RetrievalQA
         self.qa_chain = RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
@@ -126,13 +158,21 @@ class LLMAgent:
 
         logger.info("Pokémon RAG system initialized")
 
-    def create_tools(self) -> List[Tool]:
+    @property
+    def pokemon_row_count(self) -> int:
+        """Number of Pokémon entries in the loaded dataset (0 if none loaded)."""
+        df = self.data_loader.df
+        return 0 if df is None else len(df)
+
+    def create_tools(self) -> List["Tool"]:
         """
         Create LangChain tools for the agent.
 
         Returns:
             List of Tool objects
         """
+        from langchain.agents import Tool
+
         tools = []
 
         # Pokémon Database Tool
@@ -217,6 +257,9 @@ class LLMAgent:
         """Initialize the conversational agent with tools and memory."""
         logger.info("Initializing conversational agent")
 
+        from langchain.agents import AgentExecutor, ConversationalAgent
+        from langchain.memory import ConversationBufferMemory
+
         # Create memory
         self.memory = ConversationBufferMemory(
             memory_key="chat_history",
@@ -354,6 +397,16 @@ class SimpleLLMAgent:
         """Initialize Pokémon data."""
         self.data_loader.initialize(data_file)
 
+    def ingest_pokemon_data(self, data_file: str) -> Iterator[int]:
+        """Initialize Pokémon data chunk by chunk, yielding the number of rows indexed so far."""
+        yield from self.data_loader.initialize_incremental(data_file)
+
+    @property
+    def pokemon_row_count(self) -> int:
+        """Number of Pokémon entries in the loaded dataset (0 if none loaded)."""
+        df = self.data_loader.df
+        return 0 if df is None else len(df)
+
     def set_images(self, image1_path: Optional[str], image2_path: Optional[str]):
         """Set image paths."""
         self.image1_path = image1_path
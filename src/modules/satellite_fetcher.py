@@ -4,22 +4,203 @@ Fetches satellite imagery from free API sources for change detection analysis.
 """
 
 import os
+import math
+import asyncio
+import contextvars
+import hashlib
+import multiprocessing
+import re
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+import httpx
+import diskcache
 import requests
+from urllib.parse import urlencode, urlsplit
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
 from datetime import datetime
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, List, Literal
 from PIL import Image
+import numpy as np
 import io
+from dataclasses import dataclass
+from types import MappingProxyType
 import logging
 
-logging.basicConfig(level=logging.INFO)
+# Optional faster event loop (pip install uvloop), used only for the fetcher's own loops
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional SIMD JPEG decoder (pip install PyTurboJPEG; needs the libjpeg-turbo library)
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJPF_GRAY
+    _turbojpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _turbojpeg = None
+
 logger = logging.getLogger(__name__)
 
+# Satellite imagery for a given (bbox, past date) never changes, so responses are cached
+DEFAULT_CACHE_DIR = "data/cache/satellite"
+DISK_CACHE_SIZE_LIMIT = 2 ** 30  # 1 GiB
+MEMORY_CACHE_SIZE = 128  # Number of encoded images kept in memory
+ARRAY_CACHE_SIZE = 32  # Number of decoded image arrays kept in memory
+
+# Mapbox URLs carry no date and serve current imagery, and near-real-time dates
+# may still be incomplete, so those responses expire instead
+MAPBOX_CACHE_TTL = 24 * 60 * 60  # Seconds
+RECENT_IMAGERY_DAYS = 3
+RECENT_IMAGERY_CACHE_TTL = 60 * 60  # Seconds
+_URL_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Color mode of returned images: "L" (grayscale) is enough for luminance-based
+# change detection and takes a third of the memory of "RGB"
+ImageMode = Literal["RGB", "L"]
+
+# Imagery API hosts; each gets its own connection pool, and those of configured
+# sources are pre-warmed on startup
+GIBS_HOST = "https://gibs.earthdata.nasa.gov"
+SENTINEL_HUB_HOST = "https://services.sentinel-hub.com"
+MAPBOX_HOST = "https://api.mapbox.com"
+API_HOSTS = (GIBS_HOST, SENTINEL_HUB_HOST, MAPBOX_HOST)
+
+# API hosts that redirect to a CDN are remembered so later requests go straight there
+CDN_HOST_TTL = 24 * 60 * 60  # Seconds
+
+# Requests the server reported as having no imagery are not retried for a while
+NO_DATA_TTL = 60 * 60  # Seconds
+NO_DATA_STATUS_CODES = (400, 404)
+
+# Valid request ranges, checked locally before any network I/O
+MIN_ZOOM = 0
+MAX_ZOOM = 22  # Mapbox's limit; GIBS tile levels are capped separately
+
+# Skip IPv6 lookups on networks where it is broken, avoiding connect timeouts
+if os.getenv("SATFETCH_DISABLE_IPV6"):
+    urllib3.util.connection.HAS_IPV6 = False
+
+# NASA GIBS WMTS tile grid (EPSG:4326, origin at -180, 90)
+GIBS_LAYER = "MODIS_Terra_CorrectedReflectance_TrueColor"
+GIBS_TILE_MATRIX_SET = "250m"
+GIBS_TILE_SIZE = 512  # Pixels per tile side
+GIBS_LEVEL0_DEGREES_PER_PIXEL = 0.5625  # Level 0 tiles span 288 degrees
+GIBS_MAX_TILE_LEVEL = 8  # Native resolution of the 250m tile matrix set
+
+# Concurrency limits for async fetching
+MAX_CONCURRENT_FETCHES = 16  # Pair requests in flight at once in fetch_image_batch
+# Hedged GIBS requests: the WMS mirror is raced against WMTS if WMTS hasn't
+# answered within the learned median network latency
+GIBS_HEDGE_DEFAULT_DELAY = 1.0  # Seconds, used until enough latencies are recorded
+GIBS_HEDGE_MIN_SAMPLES = 5
+LATENCY_WINDOW = 50  # Number of recent network latencies kept
+
+SENTINEL_BBOX_DELTA = 0.01  # Degrees around the center point
+
+_DECODE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="satellite-decode")
+_decode_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Set while afetch_image_batch runs, so only batch decodes go to the process pool
+_batch_decoding: contextvars.ContextVar[bool] = contextvars.ContextVar("batch_decoding", default=False)
+
+
+def _get_decode_process_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool for batch JPEG decoding, creating it on first use."""
+    global _decode_process_pool
+    if _decode_process_pool is None:
+        # Spawned rather than forked: the parent runs several threads (HTTP loop,
+        # pre-warm, I/O pools), which a forked child could inherit locks from
+        _decode_process_pool = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _decode_process_pool
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop for the fetcher, using uvloop when it is installed."""
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def _is_recent_date(date: str) -> bool:
+    """Check whether a YYYY-MM-DD date is recent enough that its imagery may still change."""
+    try:
+        return (datetime.now() - datetime.strptime(date, "%Y-%m-%d")).days < RECENT_IMAGERY_DAYS
+    except ValueError:
+        return False
+
+
+def _gibs_bbox_delta(zoom: int) -> float:
+    """Get the approximate half-width in degrees of a GIBS request at a zoom level."""
+    return 0.5 / (1 << zoom)
+
+
+@lru_cache(maxsize=256)
+def _gibs_bbox(latitude: float, longitude: float, zoom: int) -> str:
+    """Build the (cached) WMS BBOX string for a GIBS request."""
+    delta = _gibs_bbox_delta(zoom)
+    return f"{longitude-delta},{latitude-delta},{longitude+delta},{latitude+delta}"
+
+
+@lru_cache(maxsize=256)
+def _sentinel_bbox(latitude: float, longitude: float) -> str:
+    """Build the (cached) WMS BBOX string for a Sentinel Hub request."""
+    delta = SENTINEL_BBOX_DELTA
+    return f"{longitude-delta},{latitude-delta},{longitude+delta},{latitude+delta}"
+
+
+def _turbo_decode(data: bytes, mode: str = "RGB") -> Optional[np.ndarray]:
+    """Decode a JPEG with libjpeg-turbo, or return None if it can't be used for this data."""
+    if _turbojpeg is None or not data.startswith(b"\xff\xd8"):
+        return None
+    if mode == "L":
+        return _turbojpeg.decode(data, pixel_format=TJPF_GRAY)[:, :, 0]
+    return _turbojpeg.decode(data, pixel_format=TJPF_RGB)
+
+
+def _decode_to_mode(data: bytes, mode: str = "RGB") -> Image.Image:
+    """Decode image bytes into a fully loaded PIL Image in the given color mode."""
+    array = _turbo_decode(data, mode)
+    if array is not None:
+        return Image.fromarray(array)
+
+    # BytesIO shares the bytes buffer rather than copying it
+    image = Image.open(io.BytesIO(data))
+    if image.format == "JPEG":
+        # Let libjpeg produce the target mode directly (e.g. no color conversion for "L")
+        image.draft(mode, image.size)
+    if image.mode != mode:
+        return image.convert(mode)
+    image.load()  # Image.open is lazy; force the decode here
+    return image
+
+
+def _decode_array(data: bytes, mode: str = "RGB") -> np.ndarray:
+    """Decode image bytes to an array (module-level so it can run in a worker process)."""
+    array = _turbo_decode(data, mode)
+    if array is not None:
+        return array
+    return np.asarray(_decode_to_mode(data, mode))
+
 
 class SatelliteImageFetcher:
     """Fetches satellite images from various free APIs."""
 
-    def __init__(self):
-        """Initialize the satellite image fetcher."""
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """
+        Initialize the satellite image fetcher.
+
+        Args:
+            cache_dir: Directory for the on-disk response cache (None to disable)
+        """
         self.nasa_gibs_base = "https://gibs.earthdata.nasa.gov/wmts/epsg4326/best"
         self.sentinel_hub_base = "https://services.sentinel-hub.com/ogc/wms"
 
@@ -27,7 +208,265 @@ class SatelliteImageFetcher:
         self.sentinel_hub_instance_id = os.getenv("SENTINEL_HUB_INSTANCE_ID")
         self.mapbox_token = os.getenv("MAPBOX_ACCESS_TOKEN")
 
-    def fetch_nasa_gibs_image(
+        # Static URL prefixes; per-request parameters are appended with urlencode
+        self._gibs_wms_prefix = (
+            "https://gibs.earthdata.nasa.gov/wms/epsg4326/best/wms.cgi?"
+            "SERVICE=WMS&REQUEST=GetMap&VERSION=1.3.0&CRS=EPSG:4326&FORMAT=image/jpeg&"
+            f"LAYERS={GIBS_LAYER}"
+        )
+        self._mapbox_static_prefix = "https://api.mapbox.com/styles/v1/mapbox/satellite-v9/static"
+
+        # Shared HTTP session so repeat requests reuse pooled TCP/TLS connections
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept-Encoding": "gzip",
+            "User-Agent": "CodexEterna/1.0"
+        })
+        for host in API_HOSTS:
+            self.session.mount(host, self._make_http_adapter())
+
+        # Directories already created by save_image
+        self._created_dirs = set()
+
+        # API host -> (CDN host it redirects to, expiry on the monotonic clock)
+        self._cdn_host_cache: Dict[str, Tuple[str, float]] = {}
+
+        # Cache key -> expiry (monotonic clock) for requests that returned no imagery
+        self._no_data_cache: Dict[str, float] = {}
+
+        # Background event loop and long-lived async client for fetch_image_pair,
+        # started by pre-warming or on first use, so repeat fetches reuse open HTTP/2 connections
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Recent network request latencies (seconds), used for request hedging
+        self._network_latencies = deque(maxlen=LATENCY_WINDOW)
+
+        # Response cache: small in-memory LRU (L1) in front of the disk cache (L2).
+        # Encoded bytes are stored rather than PIL images to keep entries small,
+        # along with the time they expire (None for never).
+        self._memory_cache: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._array_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        # Guards both in-memory caches, used from the background loop and from caller threads
+        self._memory_cache_lock = threading.Lock()
+        self.cache = None
+        if cache_dir:
+            self.cache = diskcache.Cache(cache_dir, size_limit=DISK_CACHE_SIZE_LIMIT)
+
+        # Resolve DNS and open TLS connections on the async client in the
+        # background, so the first real fetch doesn't pay for the handshake
+        if not os.getenv("SATFETCH_NO_PREWARM"):
+            asyncio.run_coroutine_threadsafe(self._aprewarm(), self._background_loop())
+
+    def _configured_hosts(self) -> List[str]:
+        """Get the API hosts of the sources that can be used (GIBS needs no credentials)."""
+        hosts = [GIBS_HOST]
+        if self.sentinel_hub_instance_id:
+            hosts.append(SENTINEL_HUB_HOST)
+        if self.mapbox_token:
+            hosts.append(MAPBOX_HOST)
+        return hosts
+
+    async def _aprewarm(self):
+        """Open connections on the long-lived async client to each configured API host, ignoring failures."""
+        client = self._shared_client()
+        hosts = self._configured_hosts()
+        results = await asyncio.gather(
+            *(client.head(host, timeout=5) for host in hosts),
+            return_exceptions=True
+        )
+        for host, result in zip(hosts, results):
+            if isinstance(result, Exception):
+                logger.debug("Pre-warming %s failed: %s", host, result)
+
+    @staticmethod
+    def _make_http_adapter() -> HTTPAdapter:
+        """Create a pooled HTTP adapter that retries transient server errors."""
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[500, 502, 503, 504]
+        )
+        return HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+
+    def close(self):
+        """Close the underlying HTTP session, background event loop and cache."""
+        self.session.close()
+        if self._loop is not None:
+            if self._client is not None:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+                self._client = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+        if self.cache is not None:
+            self.cache.close()
+
+    @property
+    def _sentinel_wms_prefix(self) -> str:
+        """Sentinel Hub WMS URL prefix, built from the current instance ID so later changes apply."""
+        return (
+            f"{self.sentinel_hub_base}/{self.sentinel_hub_instance_id}?"
+            "SERVICE=WMS&REQUEST=GetMap&VERSION=1.1.1&FORMAT=image/jpeg&"
+            "LAYERS=TRUE-COLOR-S2-L1C"
+        )
+
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        """Build a compact cache key for a request URL."""
+        return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _cache_ttl(url: str) -> Optional[int]:
+        """Get how long a response may be cached, in seconds (None for indefinitely)."""
+        if urlsplit(url).hostname == "api.mapbox.com":
+            return MAPBOX_CACHE_TTL
+        match = _URL_DATE_RE.search(url)
+        if match and _is_recent_date(match.group()):
+            return RECENT_IMAGERY_CACHE_TTL
+        return None
+
+    def _cache_get(self, url: str) -> Optional[bytes]:
+        """Look up cached response bytes for a URL."""
+        key = self._cache_key(url)
+
+        with self._memory_cache_lock:
+            entry = self._memory_cache.get(key)
+            if entry is not None:
+                data, expires_at = entry
+                if expires_at is None or time.time() < expires_at:
+                    self._memory_cache.move_to_end(key)
+                    return data
+                del self._memory_cache[key]
+
+        data = None
+        if self.cache is not None:
+            data, expires_at = self.cache.get(key, expire_time=True)
+            if data is not None:
+                self._remember(key, data, expires_at)
+        return data
+
+    def _cache_set(self, url: str, data: bytes):
+        """Store response bytes for a URL in both cache levels."""
+        key = self._cache_key(url)
+        ttl = self._cache_ttl(url)
+        self._remember(key, data, time.time() + ttl if ttl else None)
+        if self.cache is not None:
+            self.cache.set(key, data, expire=ttl)
+
+    def _remember(self, key: str, data: bytes, expires_at: Optional[float] = None):
+        """Insert into the in-memory LRU, evicting the oldest entry when full."""
+        with self._memory_cache_lock:
+            self._memory_cache[key] = (data, expires_at)
+            self._memory_cache.move_to_end(key)
+            if len(self._memory_cache) > MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
+
+    def _fetch_bytes(self, url: str) -> bytes:
+        """Download the raw response body for a URL, using the cache when possible."""
+        data = self._cache_get(url)
+        if data is not None:
+            logger.info("Using cached satellite image")
+            return data
+        self._check_no_data(url)
+
+        try:
+            with self.session.get(self._cdn_url(url), timeout=30, stream=True) as response:
+                if response.status_code in NO_DATA_STATUS_CODES:
+                    self._mark_no_data(url)
+                response.raise_for_status()
+                # Read the (gzip-decoded) body in one pass rather than joining
+                # iter_content() chunks, which holds the payload in memory twice
+                response.raw.decode_content = True
+                data = response.raw.read()
+                content_type = response.headers.get("Content-Type", "")
+                if response.history:
+                    self._record_cdn_host(url, response.url)
+        except requests.RequestException:
+            self._forget_cdn_host(url)
+            raise
+
+        self._check_service_exception(url, content_type, data)
+        self._cache_set(url, data)
+        return data
+
+    def _check_no_data(self, url: str):
+        """Raise if this request recently came back without imagery."""
+        key = self._cache_key(url)
+        expires_at = self._no_data_cache.get(key)
+        if expires_at is None:
+            return
+        if time.monotonic() >= expires_at:
+            self._no_data_cache.pop(key, None)  # Another thread may have expired it already
+            return
+        raise ValueError("No imagery available for this request (cached result)")
+
+    def _mark_no_data(self, url: str):
+        """Remember that a request returned no imagery."""
+        self._no_data_cache[self._cache_key(url)] = time.monotonic() + NO_DATA_TTL
+
+    def _check_service_exception(self, url: str, content_type: str, data: bytes):
+        """Raise if a WMS/WMTS server answered with an XML error document instead of an image."""
+        if "xml" in content_type or data.lstrip()[:5] == b"<?xml":
+            self._mark_no_data(url)
+            raise ValueError("Server returned a service exception instead of imagery")
+
+    @staticmethod
+    def _validate(
+        latitude: float,
+        longitude: float,
+        date: Optional[str] = None,
+        zoom: Optional[int] = None
+    ):
+        """
+        Check request parameters locally so bad input never costs a round trip.
+
+        Raises:
+            ValueError: If any parameter is out of range or malformed
+        """
+        if not -90 <= latitude <= 90:
+            raise ValueError(f"Latitude must be between -90 and 90, got {latitude}")
+        if not -180 <= longitude <= 180:
+            raise ValueError(f"Longitude must be between -180 and 180, got {longitude}")
+        if date is not None:
+            datetime.strptime(date, "%Y-%m-%d")  # Raises ValueError if malformed
+        if zoom is not None and not MIN_ZOOM <= zoom <= MAX_ZOOM:
+            raise ValueError(f"Zoom must be between {MIN_ZOOM} and {MAX_ZOOM}, got {zoom}")
+
+    def _cdn_url(self, url: str) -> str:
+        """Rewrite a URL to the CDN host its API host last redirected to, if known."""
+        parts = urlsplit(url)
+        entry = self._cdn_host_cache.get(parts.netloc)
+        if entry is None:
+            return url
+
+        cdn_host, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._cdn_host_cache.pop(parts.netloc, None)  # Another thread may have expired it already
+            return url
+        return parts._replace(netloc=cdn_host).geturl()
+
+    def _record_cdn_host(self, url: str, final_url: str):
+        """Remember a redirect target host when only the host changed."""
+        requested = urlsplit(url)
+        final = urlsplit(str(final_url))
+        if final.netloc != requested.netloc and requested._replace(netloc=final.netloc) == final:
+            self._cdn_host_cache[requested.netloc] = (final.netloc, time.monotonic() + CDN_HOST_TTL)
+
+    def _forget_cdn_host(self, url: str):
+        """Drop the CDN shortcut for a URL's host so the next request goes through the API."""
+        self._cdn_host_cache.pop(urlsplit(url).netloc, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _build_gibs_url(
         self,
         latitude: float,
         longitude: float,
@@ -35,6 +474,143 @@ class SatelliteImageFetcher:
         zoom: int = 10,
         width: int = 512,
         height: int = 512
+    ) -> str:
+        """Build the NASA GIBS WMS GetMap URL for a location and date."""
+        bbox = _gibs_bbox(latitude, longitude, zoom)
+
+        params = urlencode({"BBOX": bbox, "WIDTH": width, "HEIGHT": height, "TIME": date})
+        return f"{self._gibs_wms_prefix}&{params}"
+
+    def _build_gibs_tile_url(self, date: str, level: int, col: int, row: int) -> str:
+        """Build the NASA GIBS WMTS GetTile URL for a single tile."""
+        return (
+            f"{self.nasa_gibs_base}/{GIBS_LAYER}/default/{date}/"
+            f"{GIBS_TILE_MATRIX_SET}/{level}/{row}/{col}.jpg"
+        )
+
+    @staticmethod
+    def _gibs_tile_span(level: int) -> float:
+        """Get the number of degrees covered by one GIBS tile at a level."""
+        return GIBS_LEVEL0_DEGREES_PER_PIXEL * GIBS_TILE_SIZE / (2 ** level)
+
+    @classmethod
+    def _latlon_to_tile(cls, latitude: float, longitude: float, level: int) -> Tuple[int, int]:
+        """Get the (col, row) of the GIBS EPSG:4326 tile containing a point."""
+        span = cls._gibs_tile_span(level)
+        return int((longitude + 180) // span), int((90 - latitude) // span)
+
+    def _gibs_tile_grid(
+        self,
+        latitude: float,
+        longitude: float,
+        zoom: int,
+        width: int,
+        height: int
+    ) -> Tuple[int, Tuple[float, float, float, float], List[Tuple[int, int]]]:
+        """
+        Work out which GIBS tiles cover the bounding box of a request.
+
+        Returns:
+            Tuple of (tile level, (min_lon, min_lat, max_lon, max_lat), [(col, row), ...])
+        """
+        delta = _gibs_bbox_delta(zoom)  # Same approximation as the WMS request
+        bbox = (longitude - delta, latitude - delta, longitude + delta, latitude + delta)
+
+        # Pick the coarsest level that still matches the requested resolution
+        degrees_per_pixel = 2 * delta / max(width, height)
+        level = math.ceil(math.log2(GIBS_LEVEL0_DEGREES_PER_PIXEL / degrees_per_pixel))
+        level = min(max(level, 0), GIBS_MAX_TILE_LEVEL)
+
+        span = self._gibs_tile_span(level)
+        max_col = math.ceil(360 / span) - 1
+        max_row = math.ceil(180 / span) - 1
+
+        col_min, row_min = self._latlon_to_tile(bbox[3], bbox[0], level)
+        col_max, row_max = self._latlon_to_tile(bbox[1], bbox[2], level)
+        col_min, col_max = max(col_min, 0), min(col_max, max_col)
+        row_min, row_max = max(row_min, 0), min(row_max, max_row)
+
+        tiles = [
+            (col, row)
+            for row in range(row_min, row_max + 1)
+            for col in range(col_min, col_max + 1)
+        ]
+        return level, bbox, tiles
+
+    def _stitch_gibs_tiles(
+        self,
+        level: int,
+        bbox: Tuple[float, float, float, float],
+        tiles: List[Tuple[int, int]],
+        tile_images: List[Image.Image],
+        width: int,
+        height: int,
+        mode: ImageMode = "RGB"
+    ) -> Image.Image:
+        """Paste GIBS tiles into a mosaic and crop/resize it to the requested bbox."""
+        span = self._gibs_tile_span(level)
+        degrees_per_pixel = span / GIBS_TILE_SIZE
+
+        col0 = min(col for col, _ in tiles)
+        row0 = min(row for _, row in tiles)
+        num_cols = max(col for col, _ in tiles) - col0 + 1
+        num_rows = max(row for _, row in tiles) - row0 + 1
+
+        mosaic = Image.new(mode, (num_cols * GIBS_TILE_SIZE, num_rows * GIBS_TILE_SIZE))
+        for (col, row), tile in zip(tiles, tile_images):
+            mosaic.paste(tile, ((col - col0) * GIBS_TILE_SIZE, (row - row0) * GIBS_TILE_SIZE))
+
+        # Pixel box of the requested bbox inside the mosaic
+        origin_lon = -180 + col0 * span
+        origin_lat = 90 - row0 * span
+        box = (
+            max((bbox[0] - origin_lon) / degrees_per_pixel, 0),
+            max((origin_lat - bbox[3]) / degrees_per_pixel, 0),
+            min((bbox[2] - origin_lon) / degrees_per_pixel, mosaic.width),
+            min((origin_lat - bbox[1]) / degrees_per_pixel, mosaic.height)
+        )
+        return mosaic.resize((width, height), Image.BILINEAR, box=box)
+
+    def _build_sentinel_url(
+        self,
+        latitude: float,
+        longitude: float,
+        date: str,
+        width: int = 512,
+        height: int = 512
+    ) -> str:
+        """Build the Sentinel Hub WMS GetMap URL for a location and date."""
+        bbox = _sentinel_bbox(latitude, longitude)
+
+        params = urlencode({
+            "BBOX": bbox,
+            "WIDTH": width,
+            "HEIGHT": height,
+            "TIME": f"{date}/{date}"
+        })
+        return f"{self._sentinel_wms_prefix}&{params}"
+
+    def _build_mapbox_url(
+        self,
+        latitude: float,
+        longitude: float,
+        zoom: int = 15,
+        width: int = 512,
+        height: int = 512
+    ) -> str:
+        """Build the Mapbox Static Images API URL for a location."""
+        params = urlencode({"access_token": self.mapbox_token})
+        return f"{self._mapbox_static_prefix}/{longitude},{latitude},{zoom}/{width}x{height}?{params}"
+
+    def fetch_nasa_gibs_image(
+        self,
+        latitude: float,
+        longitude: float,
+        date: str,
+        zoom: int = 10,
+        width: int = 512,
+        height: int = 512,
+        mode: ImageMode = "RGB"
     ) -> Optional[Image.Image]:
         """
         Fetch satellite image from NASA GIBS (Global Imagery Browse Services).
@@ -48,50 +624,100 @@ class SatelliteImageFetcher:
             zoom: Zoom level (1-14)
             width: Image width in pixels
             height: Image height in pixels
+            mode: Color mode of the returned image ('RGB', or 'L' for grayscale)
 
         Returns:
             PIL Image object or None if failed
         """
         try:
-            logger.info(f"Fetching NASA GIBS image for ({latitude}, {longitude}) on {date}")
-
-            # Calculate tile coordinates
-            # For simplicity, using a direct image request to GIBS WMS
-            layer = "MODIS_Terra_CorrectedReflectance_TrueColor"
-
-            # Calculate bounding box (approximate)
-            delta = 0.5 / (2 ** zoom)  # Rough approximation
-            bbox = f"{longitude-delta},{latitude-delta},{longitude+delta},{latitude+delta}"
-
-            url = (
-                f"https://gibs.earthdata.nasa.gov/wms/epsg4326/best/wms.cgi?"
-                f"SERVICE=WMS&REQUEST=GetMap&VERSION=1.3.0&"
-                f"LAYERS={layer}&"
-                f"CRS=EPSG:4326&"
-                f"BBOX={bbox}&"
-                f"WIDTH={width}&HEIGHT={height}&"
-                f"FORMAT=image/jpeg&"
-                f"TIME={date}"
-            )
+            self._validate(latitude, longitude, date, zoom)
+            logger.info("Fetching NASA GIBS image for (%s, %s) on %s", latitude, longitude, date)
 
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+            # Fetch the covering WMTS tiles (each cached individually, so nearby
+            # requests reuse them) and stitch them into the requested bbox
+            level, bbox, tiles = self._gibs_tile_grid(latitude, longitude, zoom, width, height)
+            try:
+                tile_data = [
+                    self._fetch_bytes(self._build_gibs_tile_url(date, level, col, row))
+                    for col, row in tiles
+                ]
+            except Exception as e:
+                logger.warning("GIBS tile fetch failed, falling back to WMS: %s", e)
+                url = self._build_gibs_url(latitude, longitude, date, zoom, width, height)
+                image = self._decode_image(self._fetch_bytes(url), mode)
+            else:
+                tile_images = [self._decode_image(data, mode) for data in tile_data]
+                image = self._stitch_gibs_tiles(level, bbox, tiles, tile_images, width, height, mode)
 
-            image = Image.open(io.BytesIO(response.content))
             logger.info("Successfully fetched NASA GIBS image")
             return image
 
         except Exception as e:
-            logger.error(f"Error fetching NASA GIBS image: {e}")
+            logger.error("Error fetching NASA GIBS image: %s", e)
+            return None
+
+    def fetch_nasa_gibs_array(
+        self,
+        latitude: float,
+        longitude: float,
+        date: str,
+        zoom: int = 10,
+        width: int = 512,
+        height: int = 512,
+        mode: ImageMode = "RGB"
+    ) -> Optional[np.ndarray]:
+        """
+        Fetch a NASA GIBS image as a decoded array.
+
+        Decoded arrays are cached, so change-detection code that needs pixels
+        doesn't decode the same image again. The returned array is a read-only
+        view of the cached one; copy it before modifying.
+
+        Args:
+            latitude: Latitude of location
+            longitude: Longitude of location
+            date: Date in YYYY-MM-DD format
+            zoom: Zoom level (1-14)
+            width: Image width in pixels
+            height: Image height in pixels
+            mode: Color mode ('RGB', or 'L' for a single-channel grayscale array)
+
+        Returns:
+            Array of shape (height, width, 3), or (height, width) for 'L',
+            with dtype uint8, or None if failed
+        """
+        key = ("nasa", latitude, longitude, date, zoom, width, height, mode)
+        with self._memory_cache_lock:
+            array = self._array_cache.get(key)
+            if array is not None:
+                self._array_cache.move_to_end(key)
+                return array
+
+        image = self.fetch_nasa_gibs_image(latitude, longitude, date, zoom, width, height, mode)
+        if image is None:
             return None
 
+        array = np.asarray(image)
+        array.flags.writeable = False
+
+        # Recent imagery may still change, so only its (expiring) bytes are cached
+        if _is_recent_date(date):
+            return array
+
+        with self._memory_cache_lock:
+            self._array_cache[key] = array
+            if len(self._array_cache) > ARRAY_CACHE_SIZE:
+                self._array_cache.popitem(last=False)
+        return array
+
     def fetch_sentinel_hub_image(
         self,
         latitude: float,
         longitude: float,
         date: str,
         width: int = 512,
-        height: int = 512
+        height: int = 512,
+        mode: ImageMode = "RGB"
     ) -> Optional[Image.Image]:
         """
         Fetch satellite image from Sentinel Hub.
@@ -105,6 +731,7 @@ class SatelliteImageFetcher:
             date: Date in YYYY-MM-DD format
             width: Image width
             height: Image height
+            mode: Color mode of the returned image ('RGB', or 'L' for grayscale)
 
         Returns:
             PIL Image object or None if failed
@@ -114,31 +741,17 @@ class SatelliteImageFetcher:
             return None
 
         try:
-            logger.info(f"Fetching Sentinel Hub image for ({latitude}, {longitude}) on {date}")
-
-            # Calculate bounding box
-            delta = 0.01
-            bbox = f"{longitude-delta},{latitude-delta},{longitude+delta},{latitude+delta}"
-
-            url = (
-                f"{self.sentinel_hub_base}/{self.sentinel_hub_instance_id}?"
-                f"SERVICE=WMS&REQUEST=GetMap&VERSION=1.1.1&"
-                f"LAYERS=TRUE-COLOR-S2-L1C&"
-                f"BBOX={bbox}&"
-                f"WIDTH={width}&HEIGHT={height}&"
-                f"FORMAT=image/jpeg&"
-                f"TIME={date}/{date}"
-            )
+            self._validate(latitude, longitude, date)
+            logger.info("Fetching Sentinel Hub image for (%s, %s) on %s", latitude, longitude, date)
 
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+            url = self._build_sentinel_url(latitude, longitude, date, width, height)
 
-            image = Image.open(io.BytesIO(response.content))
+            image = self._decode_image(self._fetch_bytes(url), mode)
             logger.info("Successfully fetched Sentinel Hub image")
             return image
 
         except Exception as e:
-            logger.error(f"Error fetching Sentinel Hub image: {e}")
+            logger.error("Error fetching Sentinel Hub image: %s", e)
             return None
 
     def fetch_mapbox_satellite_image(
@@ -147,7 +760,8 @@ class SatelliteImageFetcher:
         longitude: float,
         zoom: int = 15,
         width: int = 512,
-        height: int = 512
+        height: int = 512,
+        mode: ImageMode = "RGB"
     ) -> Optional[Image.Image]:
         """
         Fetch satellite image from Mapbox Satellite.
@@ -162,6 +776,7 @@ class SatelliteImageFetcher:
             zoom: Zoom level (1-20)
             width: Image width (max 1280)
             height: Image height (max 1280)
+            mode: Color mode of the returned image ('RGB', or 'L' for grayscale)
 
         Returns:
             PIL Image object or None if failed
@@ -171,26 +786,331 @@ class SatelliteImageFetcher:
             return None
 
         try:
-            logger.info(f"Fetching Mapbox satellite image for ({latitude}, {longitude})")
+            self._validate(latitude, longitude, zoom=zoom)
+            logger.info("Fetching Mapbox satellite image for (%s, %s)", latitude, longitude)
 
-            # Mapbox Static Images API
-            url = (
-                f"https://api.mapbox.com/styles/v1/mapbox/satellite-v9/static/"
-                f"{longitude},{latitude},{zoom}/{width}x{height}?"
-                f"access_token={self.mapbox_token}"
-            )
+            url = self._build_mapbox_url(latitude, longitude, zoom, width, height)
 
-            response = requests.get(url, timeout=30)
+            image = self._decode_image(self._fetch_bytes(url), mode)
+            logger.info("Successfully fetched Mapbox satellite image")
+            return image
+
+        except Exception as e:
+            logger.error("Error fetching Mapbox image: %s", e)
+            return None
+
+    @staticmethod
+    def _decode_image(data: bytes, mode: ImageMode = "RGB") -> Image.Image:
+        """Decode raw image bytes into a fully loaded PIL Image."""
+        return _decode_to_mode(data, mode)
+
+    @staticmethod
+    async def _adecode_image(data: bytes, mode: ImageMode = "RGB") -> Image.Image:
+        """
+        Decode image bytes off the event loop.
+
+        PIL and libjpeg-turbo release the GIL while decoding, so the decode
+        thread pool is enough for single images and tiles. Inside
+        afetch_image_batch, where many large decodes pile up, they go to the
+        process pool instead.
+        """
+        loop = asyncio.get_running_loop()
+        if _batch_decoding.get():
+            array = await loop.run_in_executor(_get_decode_process_pool(), _decode_array, data, mode)
+            return Image.fromarray(array)
+        return await loop.run_in_executor(_DECODE_POOL, _decode_to_mode, data, mode)
+
+    async def _afetch_bytes(self, client: httpx.AsyncClient, url: str) -> bytes:
+        """Async version of _fetch_bytes."""
+        data = self._cache_get(url)
+        if data is not None:
+            logger.info("Using cached satellite image")
+            return data
+
+        self._check_no_data(url)
+
+        start = time.perf_counter()
+        try:
+            response = await client.get(self._cdn_url(url))
+            if response.status_code in NO_DATA_STATUS_CODES:
+                self._mark_no_data(url)
             response.raise_for_status()
+        except httpx.HTTPError:
+            self._forget_cdn_host(url)
+            raise
+        data = response.content
+        self._network_latencies.append(time.perf_counter() - start)
+        if response.history:
+            self._record_cdn_host(url, response.url)
 
-            image = Image.open(io.BytesIO(response.content))
-            logger.info("Successfully fetched Mapbox satellite image")
+        self._check_service_exception(url, response.headers.get("Content-Type", ""), data)
+
+        self._cache_set(url, data)
+        return data
+
+    def _hedge_delay(self) -> float:
+        """Get how long to wait for a primary request before sending a hedge request."""
+        if len(self._network_latencies) < GIBS_HEDGE_MIN_SAMPLES:
+            return GIBS_HEDGE_DEFAULT_DELAY
+        return statistics.median(self._network_latencies)
+
+    async def _afetch_image(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        source_name: str,
+        mode: ImageMode = "RGB"
+    ) -> Optional[Image.Image]:
+        """
+        Download and decode an image without blocking the event loop.
+
+        Args:
+            client: Open async HTTP client
+            url: Image URL
+            source_name: Human-readable source name for logging
+            mode: Color mode of the returned image ('RGB' or 'L')
+
+        Returns:
+            PIL Image object or None if failed
+        """
+        try:
+            data = await self._afetch_bytes(client, url)
+
+            image = await self._adecode_image(data, mode)
+            logger.info("Successfully fetched %s image", source_name)
             return image
 
         except Exception as e:
-            logger.error(f"Error fetching Mapbox image: {e}")
+            logger.error("Error fetching %s image: %s", source_name, e)
+            return None
+
+    async def _afetch_nasa_gibs_image(
+        self,
+        client: httpx.AsyncClient,
+        latitude: float,
+        longitude: float,
+        date: str,
+        zoom: int = 10,
+        width: int = 512,
+        height: int = 512,
+        mode: ImageMode = "RGB"
+    ) -> Optional[Image.Image]:
+        """
+        Async version of fetch_nasa_gibs_image.
+
+        The WMTS tile request is hedged: if it hasn't finished within the
+        learned median latency (or fails), the same image is also requested
+        from the WMS endpoint and whichever succeeds first wins.
+        """
+        try:
+            self._validate(latitude, longitude, date, zoom)
+        except ValueError as e:
+            logger.error("Invalid NASA GIBS request: %s", e)
+            return None
+
+        logger.info("Fetching NASA GIBS image for (%s, %s) on %s", latitude, longitude, date)
+
+        pending = {asyncio.create_task(
+            self._afetch_gibs_wmts(client, latitude, longitude, date, zoom, width, height, mode)
+        )}
+        hedged = False
+
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._hedge_delay())
+
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        logger.info("Successfully fetched NASA GIBS image")
+                        return task.result()
+                    logger.warning("GIBS request failed: %s", task.exception())
+
+                if not hedged:
+                    logger.info("Sending hedged GIBS WMS request")
+                    pending.add(asyncio.create_task(
+                        self._afetch_gibs_wms(client, latitude, longitude, date, zoom, width, height, mode)
+                    ))
+                    hedged = True
+
+                if not pending:
+                    logger.error("Error fetching NASA GIBS image: all endpoints failed")
+                    return None
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _afetch_gibs_wmts(
+        self,
+        client: httpx.AsyncClient,
+        latitude: float,
+        longitude: float,
+        date: str,
+        zoom: int,
+        width: int,
+        height: int,
+        mode: ImageMode = "RGB"
+    ) -> Image.Image:
+        """Fetch a GIBS image by stitching cached WMTS tiles. Raises on failure."""
+        level, bbox, tiles = self._gibs_tile_grid(latitude, longitude, zoom, width, height)
+
+        tile_data = await asyncio.gather(*(
+            self._afetch_bytes(client, self._build_gibs_tile_url(date, level, col, row))
+            for col, row in tiles
+        ))
+        tile_images = await asyncio.gather(*(self._adecode_image(data, mode) for data in tile_data))
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _DECODE_POOL, self._stitch_gibs_tiles, level, bbox, tiles, tile_images, width, height, mode
+        )
+
+    async def _afetch_gibs_wms(
+        self,
+        client: httpx.AsyncClient,
+        latitude: float,
+        longitude: float,
+        date: str,
+        zoom: int,
+        width: int,
+        height: int,
+        mode: ImageMode = "RGB"
+    ) -> Image.Image:
+        """Fetch a GIBS image with a single WMS GetMap request. Raises on failure."""
+        url = self._build_gibs_url(latitude, longitude, date, zoom, width, height)
+        return await self._adecode_image(await self._afetch_bytes(client, url), mode)
+
+    async def _afetch_sentinel_hub_image(
+        self,
+        client: httpx.AsyncClient,
+        latitude: float,
+        longitude: float,
+        date: str,
+        width: int = 512,
+        height: int = 512,
+        mode: ImageMode = "RGB"
+    ) -> Optional[Image.Image]:
+        """Async version of fetch_sentinel_hub_image."""
+        if not self.sentinel_hub_instance_id:
+            logger.warning("Sentinel Hub instance ID not configured")
             return None
 
+        try:
+            self._validate(latitude, longitude, date)
+        except ValueError as e:
+            logger.error("Invalid Sentinel Hub request: %s", e)
+            return None
+
+        logger.info("Fetching Sentinel Hub image for (%s, %s) on %s", latitude, longitude, date)
+        url = self._build_sentinel_url(latitude, longitude, date, width, height)
+        return await self._afetch_image(client, url, "Sentinel Hub", mode)
+
+    async def _afetch_mapbox_satellite_image(
+        self,
+        client: httpx.AsyncClient,
+        latitude: float,
+        longitude: float,
+        zoom: int = 15,
+        width: int = 512,
+        height: int = 512,
+        mode: ImageMode = "RGB"
+    ) -> Optional[Image.Image]:
+        """Async version of fetch_mapbox_satellite_image."""
+        if not self.mapbox_token:
+            logger.warning("Mapbox access token not configured")
+            return None
+
+        try:
+            self._validate(latitude, longitude, zoom=zoom)
+        except ValueError as e:
+            logger.error("Invalid Mapbox request: %s", e)
+            return None
+
+        logger.info("Fetching Mapbox satellite image for (%s, %s)", latitude, longitude)
+        url = self._build_mapbox_url(latitude, longitude, zoom, width, height)
+        return await self._afetch_image(client, url, "Mapbox", mode)
+
+    @staticmethod
+    def _async_client() -> httpx.AsyncClient:
+        """
+        Create an HTTP/2 client for async fetches.
+
+        Requests to the same host are multiplexed over one connection, so
+        concurrent fetches don't pay extra TCP/TLS handshakes.
+        """
+        return httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=30.0,
+            headers={"User-Agent": "CodexEterna/1.0"}
+        )
+
+    def _shared_client(self) -> httpx.AsyncClient:
+        """Get the long-lived async client, creating it on first use (background loop only)."""
+        if self._client is None:
+            self._client = self._async_client()
+        return self._client
+
+    async def _afetch_image_pair(
+        self,
+        latitude: float,
+        longitude: float,
+        date1: str,
+        date2: str,
+        source: str = "nasa",
+        **kwargs
+    ) -> Tuple[Optional[Image.Image], Optional[Image.Image]]:
+        """Fetch both images of a pair concurrently on the long-lived client. See fetch_image_pair."""
+        return await self._afetch_image_pair_with_client(
+            self._shared_client(), latitude, longitude, date1, date2, source, **kwargs
+        )
+
+    async def _afetch_image_pair_with_client(
+        self,
+        client: httpx.AsyncClient,
+        latitude: float,
+        longitude: float,
+        date1: str,
+        date2: str,
+        source: str = "nasa",
+        **kwargs
+    ) -> Tuple[Optional[Image.Image], Optional[Image.Image]]:
+        """Fetch both images of a pair concurrently using an existing client."""
+        source = source.lower()
+
+        if source == "nasa":
+            results = await asyncio.gather(
+                self._afetch_nasa_gibs_image(client, latitude, longitude, date1, **kwargs),
+                self._afetch_nasa_gibs_image(client, latitude, longitude, date2, **kwargs),
+                return_exceptions=True
+            )
+        elif source == "sentinel":
+            results = await asyncio.gather(
+                self._afetch_sentinel_hub_image(client, latitude, longitude, date1, **kwargs),
+                self._afetch_sentinel_hub_image(client, latitude, longitude, date2, **kwargs),
+                return_exceptions=True
+            )
+        elif source == "mapbox":
+            # Mapbox doesn't have temporal data, so we can only get current image
+            logger.warning("Mapbox doesn't support historical imagery - fetching current only")
+            img2 = await self._afetch_mapbox_satellite_image(client, latitude, longitude, **kwargs)
+            return None, img2
+        else:
+            logger.error("Unknown source: %s", source)
+            return None, None
+
+        images = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Error fetching image from %s: %s", source, result)
+                images.append(None)
+            else:
+                images.append(result)
+
+        return images[0], images[1]
+
     def fetch_image_pair(
         self,
         latitude: float,
@@ -203,85 +1123,251 @@ class SatelliteImageFetcher:
         """
         Fetch a pair of satellite images for change detection.
 
+        Both dates are requested concurrently, so the wall time is roughly
+        that of a single request.
+
         Args:
             latitude: Latitude of location
             longitude: Longitude of location
             date1: First date (before) in YYYY-MM-DD format
             date2: Second date (after) in YYYY-MM-DD format
             source: Image source ('nasa', 'sentinel', 'mapbox')
-            **kwargs: Additional parameters for the specific API
+            **kwargs: Additional parameters for the specific API (e.g. mode='L' for grayscale)
 
         Returns:
             Tuple of (before_image, after_image)
         """
-        logger.info(f"Fetching image pair from {source} for change detection")
+        return self.fetch_image_pair_async(
+            latitude, longitude, date1, date2, source, **kwargs
+        ).result()
 
-        if source.lower() == "nasa":
-            img1 = self.fetch_nasa_gibs_image(latitude, longitude, date1, **kwargs)
-            img2 = self.fetch_nasa_gibs_image(latitude, longitude, date2, **kwargs)
-        elif source.lower() == "sentinel":
-            img1 = self.fetch_sentinel_hub_image(latitude, longitude, date1, **kwargs)
-            img2 = self.fetch_sentinel_hub_image(latitude, longitude, date2, **kwargs)
-        elif source.lower() == "mapbox":
-            # Mapbox doesn't have temporal data, so we can only get current image
-            logger.warning("Mapbox doesn't support historical imagery - fetching current only")
-            img1 = None
-            img2 = self.fetch_mapbox_satellite_image(latitude, longitude, **kwargs)
-        else:
-            logger.error(f"Unknown source: {source}")
-            return None, None
+    def fetch_image_pair_async(
+        self,
+        latitude: float,
+        longitude: float,
+        date1: str,
+        date2: str,
+        source: str = "nasa",
+        **kwargs
+    ) -> Future:
+        """
+        Start fetching a pair of satellite images without blocking the caller.
+
+        The fetch runs on the fetcher's background event loop, whose HTTP/2
+        client stays open between calls, so repeat fetches skip the TCP/TLS
+        handshakes.
+
+        Args:
+            latitude: Latitude of location
+            longitude: Longitude of location
+            date1: First date (before) in YYYY-MM-DD format
+            date2: Second date (after) in YYYY-MM-DD format
+            source: Image source ('nasa', 'sentinel', 'mapbox')
+            **kwargs: Additional parameters for the specific API
+
+        Returns:
+            Future resolving to a tuple of (before_image, after_image)
+        """
+        logger.info("Fetching image pair from %s for change detection", source)
+
+        return asyncio.run_coroutine_threadsafe(
+            self._afetch_image_pair(latitude, longitude, date1, date2, source, **kwargs),
+            self._background_loop()
+        )
+
+    def fetch_image_async(
+        self,
+        latitude: float,
+        longitude: float,
+        date: str,
+        source: str = "nasa",
+        **kwargs
+    ) -> Future:
+        """
+        Start fetching a single satellite image without blocking the caller.
+
+        Like fetch_image_pair_async, but one Future per image lets callers
+        show each image as soon as it arrives.
+
+        Args:
+            latitude: Latitude of location
+            longitude: Longitude of location
+            date: Date in YYYY-MM-DD format (ignored by Mapbox)
+            source: Image source ('nasa', 'sentinel', 'mapbox')
+            **kwargs: Additional parameters for the specific API
+
+        Returns:
+            Future resolving to a PIL Image, or None if the fetch failed
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._afetch_single_image(latitude, longitude, date, source, **kwargs),
+            self._background_loop()
+        )
 
-        return img1, img2
+    async def _afetch_single_image(
+        self,
+        latitude: float,
+        longitude: float,
+        date: str,
+        source: str = "nasa",
+        **kwargs
+    ) -> Optional[Image.Image]:
+        """Fetch one image on the long-lived client. See fetch_image_async."""
+        client = self._shared_client()
 
-    def save_image(self, image: Image.Image, filepath: str) -> bool:
+        source = source.lower()
+        if source == "nasa":
+            return await self._afetch_nasa_gibs_image(client, latitude, longitude, date, **kwargs)
+        elif source == "sentinel":
+            return await self._afetch_sentinel_hub_image(client, latitude, longitude, date, **kwargs)
+        elif source == "mapbox":
+            return await self._afetch_mapbox_satellite_image(client, latitude, longitude, **kwargs)
+
+        logger.error("Unknown source: %s", source)
+        return None
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the fetcher's background event loop, starting its thread on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = _new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    async def afetch_image_batch(
+        self,
+        pair_requests: List[Dict]
+    ) -> List[Tuple[Optional[Image.Image], Optional[Image.Image]]]:
+        """
+        Fetch many image pairs concurrently.
+
+        At most MAX_CONCURRENT_FETCHES pairs are in flight at once, and all
+        requests share a single HTTP/2 client.
+
+        Args:
+            pair_requests: List of keyword-argument dicts for fetch_image_pair
+                (latitude, longitude, date1, date2 and optionally source and
+                API-specific parameters)
+
+        Returns:
+            List of (before_image, after_image) tuples, in request order
+        """
+        logger.info("Fetching batch of %d image pairs", len(pair_requests))
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        # Inherited by the fetch tasks gathered below
+        token = _batch_decoding.set(True)
+
+        try:
+            async with self._async_client() as client:
+                async def bounded_fetch(request: Dict):
+                    async with semaphore:
+                        try:
+                            return await self._afetch_image_pair_with_client(client, **request)
+                        except Exception as e:
+                            logger.error("Error fetching image pair %s: %s", request, e)
+                            return None, None
+
+                return await asyncio.gather(*(bounded_fetch(r) for r in pair_requests))
+        finally:
+            _batch_decoding.reset(token)
+
+    def fetch_image_batch(
+        self,
+        pair_requests: List[Dict]
+    ) -> List[Tuple[Optional[Image.Image], Optional[Image.Image]]]:
+        """
+        Fetch many image pairs concurrently (blocking wrapper).
+
+        Args:
+            pair_requests: List of keyword-argument dicts for fetch_image_pair
+
+        Returns:
+            List of (before_image, after_image) tuples, in request order
+        """
+        if hasattr(asyncio, "Runner"):  # Python 3.11+
+            with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+                return runner.run(self.afetch_image_batch(pair_requests))
+
+        loop = _new_event_loop()
+        try:
+            return loop.run_until_complete(self.afetch_image_batch(pair_requests))
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def save_image(self, image: Image.Image, filepath: str, quality: int = 95) -> bool:
         """
         Save image to file.
 
+        The format follows the file extension. JPEG is written without Huffman
+        optimization, and a .webp path uses WebP's fastest encoder (handy for
+        images only used as numerical input to change detection).
+
         Args:
             image: PIL Image object
             filepath: Path to save the image
+            quality: JPEG/WebP quality (1-100)
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            image.save(filepath, quality=95)
-            logger.info(f"Image saved to {filepath}")
+            directory = os.path.dirname(filepath)
+            if directory and directory not in self._created_dirs:
+                os.makedirs(directory, exist_ok=True)
+                self._created_dirs.add(directory)
+
+            extension = os.path.splitext(filepath)[1].lower()
+            image_format = Image.registered_extensions().get(extension, "JPEG")
+
+            if image_format == "JPEG":
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                save_kwargs = {"quality": quality, "optimize": False}
+            elif image_format == "WEBP":
+                save_kwargs = {"quality": quality, "method": 0}
+            else:
+                save_kwargs = {}
+
+            # Large buffer so the encoder's many small writes don't each hit a syscall
+            with open(filepath, "wb", buffering=1 << 20) as f:
+                image.save(f, format=image_format, **save_kwargs)
+
+            logger.info("Image saved to %s", filepath)
             return True
         except Exception as e:
-            logger.error(f"Error saving image: {e}")
+            logger.error("Error saving image: %s", e)
             return False
 
 
-# Example locations for testing
-EXAMPLE_LOCATIONS = {
-    "Amazon Rainforest (Deforestation)": {
-        "lat": -3.4653,
-        "lon": -62.2159,
-        "description": "Area showing deforestation over time"
-    },
-    "Dubai (Urban Development)": {
-        "lat": 25.2048,
-        "lon": 55.2708,
-        "description": "Rapid urban development"
-    },
-    "Aral Sea (Water Loss)": {
-        "lat": 45.0,
-        "lon": 60.0,
-        "description": "Dramatic water level changes"
-    },
-    "Las Vegas (Urban Expansion)": {
-        "lat": 36.1699,
-        "lon": -115.1398,
-        "description": "City expansion into desert"
-    },
-    "Jakarta Bay (Land Reclamation)": {
-        "lat": -6.1751,
-        "lon": 106.8650,
-        "description": "Coastal land reclamation"
-    }
-}
+@dataclass(frozen=True, slots=True)
+class Location:
+    """A named point of interest for satellite image fetching."""
+
+    lat: float
+    lon: float
+    description: str
+
+
+# Example locations for testing (read-only, safe to share across threads)
+EXAMPLE_LOCATIONS = MappingProxyType({
+    "Amazon Rainforest (Deforestation)": Location(
+        -3.4653, -62.2159, "Area showing deforestation over time"
+    ),
+    "Dubai (Urban Development)": Location(
+        25.2048, 55.2708, "Rapid urban development"
+    ),
+    "Aral Sea (Water Loss)": Location(
+        45.0, 60.0, "Dramatic water level changes"
+    ),
+    "Las Vegas (Urban Expansion)": Location(
+        36.1699, -115.1398, "City expansion into desert"
+    ),
+    "Jakarta Bay (Land Reclamation)": Location(
+        -6.1751, 106.8650, "Coastal land reclamation"
+    ),
+})
 
 
 def test_fetcher():
@@ -293,8 +1379,8 @@ def test_fetcher():
     location = EXAMPLE_LOCATIONS["Dubai (Urban Development)"]
 
     image = fetcher.fetch_nasa_gibs_image(
-        latitude=location["lat"],
-        longitude=location["lon"],
+        latitude=location.lat,
+        longitude=location.lon,
         date="2023-06-01",
         zoom=10
     )
@@ -307,4 +1393,5 @@ def test_fetcher():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     test_fetcher()
@@ -4,21 +4,44 @@ Features API integration for fetching satellite images and dedicated change dete
 """
 
 import os
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 import gradio as gr
-from typing import List, Tuple, Optional
+from PIL import Image
+from typing import Dict, Iterator, List, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
 
-# Import modules
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from modules.llm_agent import SimpleLLMAgent, LLMAgent
+# Import modules (src/ is put on sys.path once by app.py)
+from modules.llm_agent import SimpleLLMAgent
 from modules.satellite_fetcher import SatelliteImageFetcher, EXAMPLE_LOCATIONS
 from modules.change_detector import ChangeDetectionAgent
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Uploaded and fetched images handed to the agent
+IMAGES_DIR = "data/images"
+
+# Zoom level of fetched satellite images (repeat fetches are served from the fetcher's cache)
+FETCH_ZOOM = 12
+
+# The vision models resize to well under this, so larger images are downscaled before saving
+MAX_IMAGE_SIZE = (1024, 1024)
+
+# Default date range (the past year), computed from a single clock reading
+_NOW = datetime.now()
+DEFAULT_DATE_AFTER = _NOW.strftime("%Y-%m-%d")
+DEFAULT_DATE_BEFORE = (_NOW - timedelta(days=365)).strftime("%Y-%m-%d")
+
+EXAMPLE_LOCATION_NAMES = tuple(EXAMPLE_LOCATIONS)
+
+CHAT_CACHE_SIZE = 256  # Recent (images, message) -> response pairs kept in memory (simple agent only)
+
+# Minified stylesheet, read once at import
+with open(os.path.join(os.path.dirname(__file__), "static", "app.min.css")) as css_file:
+    CUSTOM_CSS = css_file.read()
+
 
 class EnhancedGradioApp:
     """Enhanced Gradio application with satellite image fetching."""
@@ -35,6 +58,7 @@ class EnhancedGradioApp:
         # Initialize components
         if use_full_llm:
             logger.info("Initializing with full LLM agent")
+            from modules.llm_agent import LLMAgent
             self.agent = LLMAgent()
         else:
             logger.info("Initializing with simple agent")
@@ -43,11 +67,23 @@ class EnhancedGradioApp:
         self.satellite_fetcher = SatelliteImageFetcher()
         self.change_detector = ChangeDetectionAgent()
 
+        # Created once here so image saves never have to check for it
+        os.makedirs(IMAGES_DIR, exist_ok=True)
+
         # State variables
         self.pokemon_data_loaded = False
         self.image1_path = None
         self.image2_path = None
         self.fetched_images = {"before": None, "after": None}
+        self._agent_image_state = (None, None)  # Image paths last passed to the agent
+        self._chat_cache: "OrderedDict[Tuple, str]" = OrderedDict()
+        # Only the simple agent answers each message on its own; the full agent keeps
+        # conversation memory, which a cached answer would skip and leave out of later turns
+        self._chat_cache_enabled = not use_full_llm
+
+        # Image files are written in the background so handlers return before disk I/O finishes
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="img-io")
+        self._pending_saves: Dict[str, Future] = {}
 
     def load_pokemon_data(self, file) -> str:
         """Load Pokémon dataset."""
@@ -63,14 +99,10 @@ class EnhancedGradioApp:
                 self.agent.initialize_pokemon_data(file.name)
 
             self.pokemon_data_loaded = True
+            self._chat_cache.clear()
 
-            import pandas as pd
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file.name)
-            else:
-                df = pd.read_excel(file.name)
-
-            return f"✅ Successfully loaded {len(df)} Pokémon entries!"
+            # The agent already parsed the file; reuse its row count instead of re-reading it
+            return f"✅ Successfully loaded {self.agent.pokemon_row_count} Pokémon entries!"
 
         except Exception as e:
             logger.error(f"Error loading Pokémon data: {e}")
@@ -84,10 +116,13 @@ class EnhancedGradioApp:
         date_before: str,
         date_after: str,
         api_source: str
-    ) -> Tuple[Optional[gr.Image], Optional[gr.Image], str]:
+    ) -> Iterator[Tuple[Optional[Image.Image], Optional[Image.Image], str]]:
         """
         Fetch satellite images from API.
 
+        This is a generator, so Gradio shows each image as soon as it arrives
+        instead of waiting for both.
+
         Args:
             location_name: Name/description of location
             latitude: Latitude coordinate
@@ -96,40 +131,70 @@ class EnhancedGradioApp:
             date_after: After date
             api_source: API source to use
 
-        Returns:
-            Tuple of (before_image, after_image, status_message)
+        Yields:
+            Tuples of (before_image, after_image, status_message)
         """
+        # Reject bad input before it costs a network round trip and API quota
+        error = self._validate_fetch_inputs(latitude, longitude, date_before, date_after)
+        if error:
+            yield None, None, f"❌ {error}"
+            return
+
         try:
             logger.info(f"Fetching satellite images for {location_name} ({latitude}, {longitude})")
 
-            # Fetch images
-            img_before, img_after = self.satellite_fetcher.fetch_image_pair(
-                latitude=latitude,
-                longitude=longitude,
-                date1=date_before,
-                date2=date_after,
-                source=api_source.lower(),
-                zoom=12
-            )
+            source = api_source.lower()
+            dates = {"before": date_before, "after": date_after}
+            images = {"before": None, "after": None}
+
+            # Mapbox has no historical imagery, so only the after image is fetched
+            labels = ("after",) if source == "mapbox" else ("before", "after")
+
+            # Fetch both dates concurrently on the fetcher's persistent connections
+            futures = {
+                self.satellite_fetcher.fetch_image_async(
+                    latitude=latitude,
+                    longitude=longitude,
+                    date=dates[label],
+                    source=source,
+                    zoom=FETCH_ZOOM
+                ): label
+                for label in labels
+            }
+            yield None, None, "⏳ Fetching satellite images..."
+
+            for future in as_completed(futures):
+                label = futures[future]
+                images[label] = future.result()
+                if images[label]:
+                    yield images["before"], images["after"], f"⏳ Fetched {label} image..."
+
+            img_before, img_after = images["before"], images["after"]
 
             if img_before is None and img_after is None:
-                return None, None, f"❌ Failed to fetch images. Check API configuration and try again."
+                yield None, None, f"❌ Failed to fetch images. Check API configuration and try again."
+                return
 
-            # Save fetched images
+            # Save fetched images, downscaling copies so the images already
+            # yielded to Gradio are never resized while in use
             if img_before:
-                path_before = "data/images/fetched_before.jpg"
-                self.satellite_fetcher.save_image(img_before, path_before)
+                small_before = img_before.copy()
+                small_before.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+                path_before = os.path.join(IMAGES_DIR, "fetched_before.jpg")
+                self._save_in_background(path_before, self.satellite_fetcher.save_image, small_before, path_before)
                 self.image1_path = path_before
                 self.fetched_images["before"] = img_before
 
             if img_after:
-                path_after = "data/images/fetched_after.jpg"
-                self.satellite_fetcher.save_image(img_after, path_after)
+                small_after = img_after.copy()
+                small_after.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+                path_after = os.path.join(IMAGES_DIR, "fetched_after.jpg")
+                self._save_in_background(path_after, self.satellite_fetcher.save_image, small_after, path_after)
                 self.image2_path = path_after
                 self.fetched_images["after"] = img_after
 
             # Update agent
-            self.agent.set_images(self.image1_path, self.image2_path)
+            self._sync_agent_images()
 
             status = "✅ Successfully fetched satellite images!\n"
             if img_before:
@@ -137,11 +202,71 @@ class EnhancedGradioApp:
             if img_after:
                 status += f"After ({date_after}): ✓"
 
-            return img_before, img_after, status
+            yield img_before, img_after, status
 
         except Exception as e:
             logger.error(f"Error fetching satellite images: {e}")
-            return None, None, f"❌ Error: {str(e)}"
+            yield None, None, f"❌ Error: {str(e)}"
+
+    @staticmethod
+    def _validate_fetch_inputs(
+        latitude: Optional[float],
+        longitude: Optional[float],
+        date_before: str,
+        date_after: str
+    ) -> Optional[str]:
+        """Check fetch inputs, returning an error message or None if they are valid."""
+        if latitude is None or longitude is None:
+            return "Please enter both latitude and longitude."
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return "Invalid coordinates: latitude must be in [-90, 90] and longitude in [-180, 180]."
+
+        try:
+            before = datetime.strptime(date_before.strip(), "%Y-%m-%d")
+            after = datetime.strptime(date_after.strip(), "%Y-%m-%d")
+        except ValueError:
+            return "Invalid date: use the YYYY-MM-DD format."
+
+        if before >= after:
+            return "The before date must be earlier than the after date."
+        return None
+
+    def _sync_agent_images(self):
+        """Pass the current image paths to the agent, skipping the call if they haven't changed."""
+        # Image files are overwritten in place, so cached answers may be stale
+        self._chat_cache.clear()
+
+        state = (self.image1_path, self.image2_path)
+        if state != self._agent_image_state:
+            self.agent.set_images(*state)
+            self._agent_image_state = state
+
+    def _save_in_background(self, path: str, save_fn, *args):
+        """Queue an image write on the I/O pool; writes to the same path run in order."""
+        previous = self._pending_saves.get(path)
+
+        def write():
+            if previous is not None:
+                wait([previous])
+            save_fn(*args)
+
+        self._pending_saves[path] = self._io_pool.submit(write)
+
+    def _wait_for_saves(self):
+        """Block until queued image writes finish, so the agent reads complete files."""
+        for path, future in list(self._pending_saves.items()):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error saving image {path}: {e}")
+            if self._pending_saves.get(path) is future:
+                del self._pending_saves[path]
+
+    @staticmethod
+    def _save_upload(image: Image.Image, path: str):
+        """Save an uploaded image as JPEG, much cheaper to encode and decode than PNG."""
+        image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+        image.convert("RGB").save(path, "JPEG", quality=90, optimize=False, subsampling=1)
 
     def upload_image1(self, image) -> str:
         """Upload first image."""
@@ -149,12 +274,11 @@ class EnhancedGradioApp:
             return "No image uploaded."
 
         try:
-            path = "data/images/temp_image1.png"
-            os.makedirs("data/images", exist_ok=True)
-            image.save(path)
+            path = os.path.join(IMAGES_DIR, "temp_image1.jpg")
+            self._save_in_background(path, self._save_upload, image, path)
 
             self.image1_path = path
-            self.agent.set_images(self.image1_path, self.image2_path)
+            self._sync_agent_images()
 
             return "✅ First image uploaded successfully!"
 
@@ -168,12 +292,11 @@ class EnhancedGradioApp:
             return "No image uploaded."
 
         try:
-            path = "data/images/temp_image2.png"
-            os.makedirs("data/images", exist_ok=True)
-            image.save(path)
+            path = os.path.join(IMAGES_DIR, "temp_image2.jpg")
+            self._save_in_background(path, self._save_upload, image, path)
 
             self.image2_path = path
-            self.agent.set_images(self.image1_path, self.image2_path)
+            self._sync_agent_images()
 
             return "✅ Second image uploaded successfully!"
 
@@ -193,14 +316,12 @@ class EnhancedGradioApp:
 
         try:
             logger.info("Running dedicated change detection analysis")
+            self._wait_for_saves()
 
             # Run analysis with specialized change detector
             analysis = self.change_detector.analyze_temporal_changes(
                 self.image1_path,
-                self.image2_path,
-                date1=None,  # Could be extracted from UI
-                date2=None,
-                location=None
+                self.image2_path
             )
 
             # Return the detailed report
@@ -216,7 +337,18 @@ class EnhancedGradioApp:
             return history, ""
 
         try:
-            response = self.agent.chat(message)
+            key = (self.image1_path, self.image2_path, message)
+            response = self._chat_cache.get(key) if self._chat_cache_enabled else None
+            if response is not None:
+                self._chat_cache.move_to_end(key)
+            else:
+                self._wait_for_saves()
+                response = self.agent.chat(message)
+                if self._chat_cache_enabled:
+                    self._chat_cache[key] = response
+                    if len(self._chat_cache) > CHAT_CACHE_SIZE:
+                        self._chat_cache.popitem(last=False)
+
             history.append((message, response))
             return history, ""
 
@@ -228,59 +360,22 @@ class EnhancedGradioApp:
 
     def clear_chat(self) -> List:
         """Clear chat history."""
+        self._chat_cache.clear()
         if hasattr(self.agent, 'reset_memory'):
             self.agent.reset_memory()
         return []
 
-    def load_example_location(self, location_name: str) -> Tuple[str, float, float, str]:
-        """Load example location coordinates."""
+    def load_example_location(self, location_name: str) -> Tuple:
+        """Load example location coordinates, leaving the fields untouched for unknown names."""
         if location_name in EXAMPLE_LOCATIONS:
             loc = EXAMPLE_LOCATIONS[location_name]
-            return location_name, loc["lat"], loc["lon"], loc["description"]
-        return "", 0.0, 0.0, ""
+            return location_name, loc.lat, loc.lon, loc.description
+        return gr.update(), gr.update(), gr.update(), gr.update()
 
     def build_interface(self):
         """Build and return the enhanced Gradio interface."""
 
-        # Custom CSS
-        custom_css = """
-        .gradio-container {
-            background: linear-gradient(135deg, #ffffff 0%, #f8f0ff 100%) !important;
-            font-family: 'Segoe UI', Arial, sans-serif;
-        }
-        .header-title {
-            background: linear-gradient(90deg, #DAA520 0%, #9370DB 50%, #FFB6C1 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            font-size: 2.5em;
-            font-weight: bold;
-            text-align: center;
-            padding: 20px;
-        }
-        .section-header {
-            background: linear-gradient(90deg, #9370DB 0%, #DAA520 100%);
-            color: white;
-            padding: 12px;
-            border-radius: 8px;
-            margin: 10px 0;
-            font-weight: bold;
-        }
-        button {
-            background: linear-gradient(135deg, #DAA520 0%, #9370DB 100%) !important;
-            border: none !important;
-            color: white !important;
-            font-weight: bold !important;
-            border-radius: 8px !important;
-        }
-        .api-info {
-            background: #f0e6ff;
-            padding: 15px;
-            border-radius: 8px;
-            border-left: 4px solid #9370DB;
-        }
-        """
-
-        with gr.Blocks(css=custom_css, theme=gr.themes.Soft(
+        with gr.Blocks(css=CUSTOM_CSS, theme=gr.themes.Soft(
             primary_hue="purple",
             secondary_hue="pink"
         )) as interface:
@@ -306,7 +401,7 @@ class EnhancedGradioApp:
 
                             # Example location selector
                             example_location = gr.Dropdown(
-                                choices=list(EXAMPLE_LOCATIONS.keys()),
+                                choices=EXAMPLE_LOCATION_NAMES,
                                 label="Quick Select Example Location",
                                 value=None
                             )
@@ -337,17 +432,13 @@ class EnhancedGradioApp:
                             gr.Markdown("---")
                             gr.Markdown("### 📅 Date Selection")
 
-                            # Default dates
-                            default_before = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
-                            default_after = datetime.now().strftime("%Y-%m-%d")
-
                             date_before = gr.Textbox(
                                 label="Before Date (YYYY-MM-DD)",
-                                value=default_before
+                                value=DEFAULT_DATE_BEFORE
                             )
                             date_after = gr.Textbox(
                                 label="After Date (YYYY-MM-DD)",
-                                value=default_after
+                                value=DEFAULT_DATE_AFTER
                             )
 
                             gr.Markdown("---")
@@ -577,9 +668,12 @@ def launch_enhanced_app(use_full_llm: bool = False, share: bool = False, server_
     interface.launch(
         share=share,
         server_port=server_port,
-        server_name="0.0.0.0"
+        server_name="0.0.0.0",
+        max_threads=40,
+        show_api=False  # Skip generating API docs this app doesn't use
     )
 
 
 if __name__ == "__main__":
+    # Run from src/ as `python -m ui.enhanced_gradio_app`
     launch_enhanced_app(use_full_llm=False, share=False)
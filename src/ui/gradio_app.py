@@ -4,18 +4,31 @@ Features a gold, purple, white, and pink color scheme.
 """
 
 import os
+import asyncio
 import gradio as gr
-from typing import List, Tuple, Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple, Optional
 import logging
 
-# Import agent module
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from modules.llm_agent import SimpleLLMAgent, LLMAgent
+# Import agent module (src/ is put on sys.path once by app.py)
+from modules.llm_agent import SimpleLLMAgent
+from modules.image_analyzer import image_fingerprint
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Minified stylesheet for the gold, purple, white and pink theme, read once at import
+with open(os.path.join(os.path.dirname(__file__), "static", "gradio_app.min.css")) as css_file:
+    CUSTOM_CSS = css_file.read()
+
+# Clickable example questions; their answers are cached per dataset and image pair
+EXAMPLE_QUESTIONS = (
+    "What are the top 5 Pokémon with the highest Attack stat?",
+    "Tell me about Electric-type Pokémon",
+    "Describe the first image",
+    "What differences do you see between the two images?",
+    "Compare the images and tell me what changed"
+)
+
 
 class GradioApp:
     """Gradio application wrapper."""
@@ -32,6 +45,7 @@ class GradioApp:
         # Initialize agent
         if use_full_llm:
             logger.info("Initializing with full LLM agent")
+            from modules.llm_agent import LLMAgent
             self.agent = LLMAgent()
         else:
             logger.info("Initializing with simple agent")
@@ -39,117 +53,143 @@ class GradioApp:
 
         # State variables
         self.pokemon_data_loaded = False
-        self.image1_path = None
-        self.image2_path = None
-
-    def load_pokemon_data(self, file) -> str:
+        # Paths of the uploaded images (before, after), in Gradio's upload cache, handed to the agent directly
+        self._images = [None, None]
+        # Content fingerprints of the current image files, to skip identical re-uploads
+        self._image_hashes = [None, None]
+        # (image 1 hash, image 2 hash, question) -> response for the example questions
+        self._example_cache: Dict[Tuple, str] = {}
+        # The full agent answers from its conversation memory, so only the stateless agent's answers are cached
+        self._example_cache_enabled = not use_full_llm
+
+        # One upload handler per image slot, built once
+        self.upload_image1 = self._make_image_uploader(0)
+        self.upload_image2 = self._make_image_uploader(1)
+
+    async def load_pokemon_data(self, file) -> AsyncIterator[str]:
         """
         Load Pokémon dataset.
 
+        The file is read and indexed in chunks on a worker thread, so progress
+        is reported while large datasets load without blocking the event loop.
+
         Args:
             file: Uploaded file object
 
-        Returns:
-            Status message
+        Yields:
+            Status messages
         """
         if file is None:
-            return "❌ No file uploaded."
+            yield "❌ No file uploaded."
+            return
 
         try:
             logger.info(f"Loading Pokémon data from: {file.name}")
 
             # Initialize data
             if self.use_full_llm:
-                self.agent.initialize_pokemon_rag(file.name)
+                progress = self.agent.ingest_pokemon_rag(file.name)
             else:
-                self.agent.initialize_pokemon_data(file.name)
+                progress = self.agent.ingest_pokemon_data(file.name)
 
-            self.pokemon_data_loaded = True
+            while True:
+                rows_indexed = await asyncio.to_thread(next, progress, None)
+                if rows_indexed is None:
+                    break
+                yield f"⏳ Indexed {rows_indexed} Pokémon entries..."
 
-            # Count rows
-            import pandas as pd
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file.name)
-            else:
-                df = pd.read_excel(file.name)
+            self.pokemon_data_loaded = True
+            self._example_cache.clear()
 
-            return f"✅ Successfully loaded {len(df)} Pokémon entries!"
+            # Count rows from the DataFrame the agent already parsed
+            yield f"✅ Successfully loaded {self.agent.pokemon_row_count} Pokémon entries!"
 
         except Exception as e:
             logger.error(f"Error loading Pokémon data: {e}")
-            return f"❌ Error loading data: {str(e)}"
-
-    def upload_image1(self, image) -> str:
-        """Upload first image."""
-        if image is None:
-            return "No image uploaded."
+            yield f"❌ Error loading data: {str(e)}"
 
-        try:
-            # Save to temporary location
-            path = "data/images/temp_image1.png"
-            os.makedirs("data/images", exist_ok=True)
-            image.save(path)
+    def _make_image_uploader(self, slot: int) -> Callable[..., Awaitable[str]]:
+        """
+        Build the upload handler for one image slot.
 
-            self.image1_path = path
-            self.agent.set_images(self.image1_path, self.image2_path)
+        Args:
+            slot: 0 for the first (before) image, 1 for the second (after) image
 
-            return "✅ First image uploaded successfully!"
+        Returns:
+            Async handler taking the uploaded image's path and returning a status message
+        """
+        success_msg = f"✅ {('First', 'Second')[slot]} image uploaded successfully!"
 
-        except Exception as e:
-            logger.error(f"Error uploading image 1: {e}")
-            return f"❌ Error: {str(e)}"
+        async def upload_image(image) -> str:
+            if image is None:
+                return "No image uploaded."
 
-    def upload_image2(self, image) -> str:
-        """Upload second image."""
-        if image is None:
-            return "No image uploaded."
+            try:
+                fingerprint = await asyncio.to_thread(image_fingerprint, image)
+                if fingerprint == self._image_hashes[slot]:
+                    return success_msg
 
-        try:
-            # Save to temporary location
-            path = "data/images/temp_image2.png"
-            os.makedirs("data/images", exist_ok=True)
-            image.save(path)
+                self._images[slot] = image
+                self._image_hashes[slot] = fingerprint
+                self.agent.set_images(*self._images)
 
-            self.image2_path = path
-            self.agent.set_images(self.image1_path, self.image2_path)
+                return success_msg
 
-            return "✅ Second image uploaded successfully!"
+            except Exception as e:
+                logger.error(f"Error uploading image {slot + 1}: {e}")
+                return f"❌ Error: {str(e)}"
 
-        except Exception as e:
-            logger.error(f"Error uploading image 2: {e}")
-            return f"❌ Error: {str(e)}"
+        upload_image.__doc__ = f"Upload image {slot + 1}."
+        return upload_image
 
-    def chat_response(self, message: str, history: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], str]:
+    async def chat_response(
+        self, message: str, history: List[Dict[str, str]]
+    ) -> AsyncIterator[Tuple[List[Dict[str, str]], str]]:
         """
         Handle chat messages.
 
+        The same history list is appended to and yielded as the turn
+        progresses. Gradio diffs streamed outputs, so only the new messages
+        are sent to the browser rather than the whole conversation.
+
         Args:
             message: User message
-            history: Chat history
+            history: Chat history in messages format
 
-        Returns:
+        Yields:
             Updated history and empty string for input box
         """
         if not message.strip():
-            return history, ""
+            yield history, ""
+            return
 
-        try:
-            # Get response from agent
-            response = self.agent.chat(message)
-
-            # Update history
-            history.append((message, response))
+        # Show the user's message and clear the input straight away
+        history.append({"role": "user", "content": message})
+        yield history, ""
 
-            return history, ""
+        try:
+            # Example questions asked again against the same data and images reuse the last answer
+            cacheable = self._example_cache_enabled and message in EXAMPLE_QUESTIONS
+            key = (*self._image_hashes, message) if cacheable else None
+            response = self._example_cache.get(key) if key else None
+            if response is None:
+                # Get response from agent on a worker thread, keeping the event loop free
+                response = await asyncio.to_thread(self.agent.chat, message)
+                if key:
+                    self._example_cache[key] = response
+
+            history.append({"role": "assistant", "content": response})
 
         except Exception as e:
             logger.error(f"Error in chat: {e}")
             error_msg = f"Sorry, I encountered an error: {str(e)}"
-            history.append((message, error_msg))
-            return history, ""
+            history.append({"role": "assistant", "content": error_msg})
 
-    def clear_chat(self) -> List:
-        """Clear chat history."""
+        yield history, ""
+
+    async def clear_chat(self) -> List:
+        """Clear chat history (async, so it runs on the event loop instead of a worker thread)."""
+        self._example_cache.clear()
         if hasattr(self.agent, 'reset_memory'):
             self.agent.reset_memory()
         return []
@@ -157,80 +197,7 @@ class GradioApp:
     def build_interface(self):
         """Build and return the Gradio interface."""
 
-        # Custom CSS for color scheme
-        custom_css = """
-        .gradio-container {
-            background: linear-gradient(135deg, #ffffff 0%, #f8f0ff 100%) !important;
-            font-family: 'Segoe UI', Arial, sans-serif;
-        }
-
-        .header-title {
-            background: linear-gradient(90deg, #DAA520 0%, #9370DB 50%, #FFB6C1 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            font-size: 2.5em;
-            font-weight: bold;
-            text-align: center;
-            padding: 20px;
-        }
-
-        .section-header {
-            background: linear-gradient(90deg, #9370DB 0%, #DAA520 100%);
-            color: white;
-            padding: 12px;
-            border-radius: 8px;
-            margin: 10px 0;
-            font-weight: bold;
-        }
-
-        button {
-            background: linear-gradient(135deg, #DAA520 0%, #9370DB 100%) !important;
-            border: none !important;
-            color: white !important;
-            font-weight: bold !important;
-            border-radius: 8px !important;
-            transition: transform 0.2s !important;
-        }
-
-        button:hover {
-            transform: scale(1.05) !important;
-        }
-
-        .chatbot {
-            border: 2px solid #9370DB !important;
-            border-radius: 12px !important;
-            background: white !important;
-        }
-
-        .message.user {
-            background: linear-gradient(135deg, #FFB6C1 0%, #FFC0CB 100%) !important;
-            border-radius: 12px !important;
-            padding: 10px !important;
-        }
-
-        .message.bot {
-            background: linear-gradient(135deg, #E6E6FA 0%, #F0E6FF 100%) !important;
-            border-radius: 12px !important;
-            padding: 10px !important;
-        }
-
-        .upload-area {
-            border: 3px dashed #9370DB !important;
-            border-radius: 12px !important;
-            background: #f8f0ff !important;
-            padding: 20px !important;
-        }
-
-        .status-message {
-            background: linear-gradient(135deg, #DAA520 0%, #FFB6C1 100%);
-            color: white;
-            padding: 10px;
-            border-radius: 8px;
-            font-weight: bold;
-        }
-        """
-
-        with gr.Blocks(css=custom_css, theme=gr.themes.Soft(
+        with gr.Blocks(css=CUSTOM_CSS, theme=gr.themes.Soft(
             primary_hue="purple",
             secondary_hue="pink",
             neutral_hue="zinc"
@@ -273,7 +240,7 @@ class GradioApp:
 
                     image1 = gr.Image(
                         label="📷 Image 1 (Before)",
-                        type="pil",
+                        type="filepath",  # Pass the upload through undecoded; the analyzer loads it on demand
                         elem_classes=["upload-area"]
                     )
                     image1_status = gr.Textbox(
@@ -284,7 +251,7 @@ class GradioApp:
 
                     image2 = gr.Image(
                         label="📷 Image 2 (After)",
-                        type="pil",
+                        type="filepath",
                         elem_classes=["upload-area"]
                     )
                     image2_status = gr.Textbox(
@@ -299,6 +266,7 @@ class GradioApp:
 
                     chatbot = gr.Chatbot(
                         label="Conversation",
+                        type="messages",
                         height=500,
                         elem_classes=["chatbot"]
                     )
@@ -317,13 +285,7 @@ class GradioApp:
                     # Example queries
                     gr.Markdown("### 💡 Example Questions")
                     gr.Examples(
-                        examples=[
-                            "What are the top 5 Pokémon with the highest Attack stat?",
-                            "Tell me about Electric-type Pokémon",
-                            "Describe the first image",
-                            "What differences do you see between the two images?",
-                            "Compare the images and tell me what changed"
-                        ],
+                        examples=list(EXAMPLE_QUESTIONS),
                         inputs=msg
                     )
 
@@ -363,41 +325,57 @@ class GradioApp:
             """)
 
             # Event Handlers
+            # Dataset ingestion and chat get separate concurrency pools, so a
+            # slow upload never holds up conversations. Every session shares one
+            # agent, whose memory, lazily loaded models and image paths aren't
+            # thread-safe, so chat, image and clear events run one at a time
             load_pokemon_btn.click(
                 fn=self.load_pokemon_data,
                 inputs=[pokemon_file],
-                outputs=[pokemon_status]
+                outputs=[pokemon_status],
+                concurrency_id="ingest",
+                concurrency_limit=1
             )
 
             image1.change(
                 fn=self.upload_image1,
                 inputs=[image1],
-                outputs=[image1_status]
+                outputs=[image1_status],
+                show_progress="hidden",
+                concurrency_id="chat"
             )
 
             image2.change(
                 fn=self.upload_image2,
                 inputs=[image2],
-                outputs=[image2_status]
+                outputs=[image2_status],
+                show_progress="hidden",
+                concurrency_id="chat"
             )
 
             send_btn.click(
                 fn=self.chat_response,
                 inputs=[msg, chatbot],
-                outputs=[chatbot, msg]
+                outputs=[chatbot, msg],
+                concurrency_id="chat",
+                concurrency_limit=1
             )
 
             msg.submit(
                 fn=self.chat_response,
                 inputs=[msg, chatbot],
-                outputs=[chatbot, msg]
+                outputs=[chatbot, msg],
+                concurrency_id="chat",
+                concurrency_limit=1
             )
 
             clear_btn.click(
                 fn=self.clear_chat,
-                outputs=[chatbot]
+                outputs=[chatbot],
+                concurrency_id="chat"
             )
 
+        interface.queue(max_size=64)
         return interface
 
 
@@ -423,5 +401,5 @@ def launch_app(use_full_llm: bool = False, share: bool = False, server_port: int
 
 
 if __name__ == "__main__":
-    # Launch with simple agent by default
+    # Launch with simple agent by default; run from src/ as `python -m ui.gradio_app`
     launch_app(use_full_llm=False, share=False)